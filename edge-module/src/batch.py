@@ -0,0 +1,221 @@
+"""Offline Batch Analysis of Recorded Footage.
+
+Streams frames from video files through batched YOLO inference, the
+same confidence/cooldown filter as the live pipeline and event
+generation, as fast as the hardware allows. Files are processed in
+parallel, one process per file.
+
+    python batch.py cam1.mp4 cam2.mp4 -o events.jsonl
+    python batch.py recordings/*.mp4 -o events.parquet --stride 5 --workers 4
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from capture import iter_recorded_frames
+from cascade import Cascade
+from config import Config, ConfigSnapshot, load_config
+from cooldown import CooldownFilter
+from inference import run_yolo_inference_batch
+from models import DetectionEvent
+from shared import log
+
+
+def process_file(
+    path: str,
+    config_values: dict,
+    batch_size: int = 16,
+    stride: int = 1,
+    max_frames: int | None = None,
+) -> tuple[str, list[dict], dict]:
+    """
+    Detect events in one recording (runs in a worker process).
+
+    Cooldown uses the position in the recording, not wall time, so the
+    events match what the live system would have produced. Each file
+    gets its own cascade state, since pool workers are reused.
+
+    Args:
+        path (str): Video file or directory of images
+        config_values (dict): ConfigSnapshot.as_dict() (snapshots don't pickle)
+        batch_size (int): Frames per model call
+        stride (int): Analyze every Nth frame
+        max_frames (int | None): Stop after this many frames
+
+    Returns:
+        tuple: (path, event records, stats)
+    """
+    cfg = ConfigSnapshot(config_values)
+    cooldown = CooldownFilter()
+    cascade = Cascade()
+    records = []
+    frames_done = 0
+    start = time.perf_counter()
+
+    def flush(batch: list) -> None:
+        frames = [frame for _, _, frame in batch]
+        for (frame_id, video_s, _), detections in zip(
+            batch, run_yolo_inference_batch(frames, cfg, cascade)
+        ):
+            for i, det in enumerate(detections):
+                if cooldown.check(det["class"], det["confidence"], video_s, cfg):
+                    continue
+                event = DetectionEvent(det["class"], det["confidence"], frame_id)
+                record = event.to_dict()
+                # id(event) is reused once the event is freed; this is stable
+                record["event_id"] = f"{path}:{frame_id}:{i}"
+                # Wall clock is processing time, not when it happened
+                del record["timestamp"]
+                record["source"] = path
+                record["video_time_s"] = round(video_s, 3)
+                record["box"] = list(det.get("box", ()))
+                records.append(record)
+
+    batch = []
+    for item in iter_recorded_frames(path, max_frames, stride):
+        batch.append(item)
+        frames_done += 1
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    elapsed = time.perf_counter() - start
+    stats = {"frames": frames_done, "seconds": elapsed}
+    return path, records, stats
+
+
+def write_jsonl(records: list[dict], out) -> None:
+    """Append records to an open text file, one JSON object per line."""
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def write_parquet(records: list[dict], path: str) -> None:
+    """Write records to a Parquet file (requires pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit(
+            "Salida Parquet requiere pyarrow (pip install pyarrow). "
+            "Usa una salida .jsonl."
+        ) from None
+    pq.write_table(pa.Table.from_pylist(records), path)
+
+
+def run_batch(
+    paths: list[str],
+    output: str,
+    workers: int | None = None,
+    batch_size: int = 16,
+    stride: int = 1,
+    max_frames: int | None = None,
+) -> tuple[int, list[str]]:
+    """
+    Process recordings in parallel and write all events.
+
+    JSONL output is written as each file finishes; Parquet at the end.
+    A file that fails is logged and skipped; the others still finish.
+
+    Returns:
+        tuple: (number of events written, paths that failed)
+    """
+    cfg = load_config(os.environ.get("EDGE_CONFIG", Config.CONFIG_PATH))
+    values = cfg.replace(LIVE_MODE=True).as_dict()
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    parquet = output.endswith(".parquet")
+
+    log(f"[BATCH ] {len(paths)} archivo(s), {workers} proceso(s) → {output}")
+    start = time.perf_counter()
+    total_frames = 0
+    count = 0
+    failed = []
+    collected = []  # Parquet only: written in one go at the end
+
+    out = None if parquet else open(output, "w", encoding="utf-8")
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(process_file, p, values, batch_size, stride, max_frames): p
+                for p in paths
+            }
+            for future in as_completed(futures):
+                try:
+                    path, records, stats = future.result()
+                except Exception as e:
+                    failed.append(futures[future])
+                    log(f"[BATCH ] ✗ {futures[future]}: {type(e).__name__}: {e}")
+                    continue
+                total_frames += stats["frames"]
+                fps = stats["frames"] / stats["seconds"] if stats["seconds"] else 0
+                log(
+                    f"[BATCH ] ✓ {path}: {stats['frames']} frames, "
+                    f"{len(records)} evento(s), {fps:.1f} FPS"
+                )
+                count += len(records)
+                if parquet:
+                    collected.extend(records)
+                else:
+                    write_jsonl(records, out)
+                    out.flush()
+    finally:
+        if out is not None:
+            out.close()
+
+    if parquet:
+        write_parquet(collected, output)
+
+    elapsed = time.perf_counter() - start
+    log(
+        f"[BATCH ] Terminado: {total_frames} frames, {count} evento(s) "
+        f"en {elapsed:.1f} s"
+    )
+    if failed:
+        log(f"[BATCH ] {len(failed)} archivo(s) con error: {', '.join(failed)}")
+    return count, failed
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"debe ser >= 1 (recibido {value})")
+    return value
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="Video files or image directories")
+    parser.add_argument(
+        "-o", "--output", default="events.jsonl",
+        help="Output file (.jsonl, or .parquet with pyarrow)",
+    )
+    parser.add_argument("--workers", type=_positive_int, default=None, help="Processes")
+    parser.add_argument(
+        "--batch", type=_positive_int, default=16, help="Frames per model call"
+    )
+    parser.add_argument(
+        "--stride", type=_positive_int, default=1, help="Analyze every Nth frame"
+    )
+    parser.add_argument("--max-frames", type=_positive_int, default=None)
+    args = parser.parse_args()
+
+    _, failed = run_batch(
+        args.paths,
+        args.output,
+        workers=args.workers,
+        batch_size=args.batch,
+        stride=args.stride,
+        max_frames=args.max_frames,
+    )
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
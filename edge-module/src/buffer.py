@@ -1,78 +1,565 @@
 """Local Buffer for Network Failure Tolerance."""
 
+import json
+import os
 import threading
+import time
 from collections import deque
 
 try:
-    from .models import DetectionEvent
+    from .models import AggregatedEvent, DetectionEvent
     from .shared import log
-    from .config import Config
+    from .config import get_config
+    from .memory import event_bytes
 except ImportError:
-    from models import DetectionEvent
+    from models import AggregatedEvent, DetectionEvent
     from shared import log
-    from config import Config
+    from config import get_config
+    from memory import event_bytes
 
 
 class LocalBuffer:
     """
-    FIFO queue with maximum capacity.
+    FIFO queue with maximum capacity and event compaction.
 
     When full, drops oldest event. Thread-safe via internal lock.
     Policy: Newest events are more valuable than old ones.
+
+    Compaction: the first detection of each intrusion is kept exactly.
+    Later detections of the same class within ``compact_window_s`` of
+    the previous one are folded into a single AggregatedEvent stored
+    right after it, so a long outage costs at most two records per
+    intrusion instead of one per cooldown period.
+
+    Spilling: under memory pressure, spill() moves the oldest records of
+    closed intrusions to a JSONL file (open ones stay in memory so they
+    keep compacting). Every record keeps its position, so flush() and
+    checkout() return memory and disk records merged oldest first, and
+    only read back from disk what they hand out. The file is consumed
+    from the front by offset; records requeued after a failed send just
+    rewind it.
     """
 
-    def __init__(self, max_size: int = Config.BUFFER_MAX):
+    def __init__(
+        self,
+        max_size: int | None = None,
+        compact_window_s: float | None = None,
+        spill_path: str | None = None,
+        spill_max: int | None = None,
+    ):
         """
         Initialize buffer.
 
         Args:
-            max_size (int): Maximum number of events to buffer
+            max_size (int | None): Maximum number of events to buffer
+                (defaults to the active BUFFER_MAX)
+            compact_window_s (float | None): Max gap between detections
+                folded into one record; 0 disables compaction
+                (defaults to the active BUFFER_COMPACT_WINDOW_S)
+            spill_path (str | None): JSONL file for spilled records
+                (defaults to the active SPILL_PATH)
+            spill_max (int | None): Max records on disk, oldest dropped
+                first; 0 = unlimited (defaults to the active SPILL_MAX)
         """
-        self._buffer: deque[DetectionEvent] = deque(maxlen=max_size)
+        cfg = get_config()
+        if max_size is None:
+            max_size = cfg.BUFFER_MAX
+        if compact_window_s is None:
+            compact_window_s = cfg.BUFFER_COMPACT_WINDOW_S
+        self._spill_path = spill_path or cfg.SPILL_PATH
+        self.spill_max = cfg.SPILL_MAX if spill_max is None else spill_max
+        self.compact_window_s = compact_window_s
+        self._buffer: deque = deque(maxlen=max_size)
+        # Open intrusion per class: [first_event, aggregate | None]
+        self._open: dict[str, list] = {}
+        # ids of records sent but not yet acknowledged (store-and-forward)
+        self._inflight: set[int] = set()
         self._lock = threading.Lock()
+        # Position of every record: memory and disk merge oldest first
+        self._seqs: dict[int, int] = {}
+        self._next_seq = 0
+        self._first_seq = 0
+        # Records handed out by flush(): id → (seq, spill file offset | None)
+        self._handed_out: dict[int, tuple] = {}
+        self._scan_spilled()
+        if self._spilled:
+            log(f"[BUFFER] {self._spilled} evento(s) pendientes en {self._spill_path}.")
 
-    def push(self, event: DetectionEvent) -> None:
+    def push(self, event) -> None:
         """
-        Add event to buffer.
+        Add event to buffer, compacting it into an open intrusion if possible.
 
         If buffer is at capacity, oldest event is automatically discarded.
 
         Args:
-            event (DetectionEvent): Event to buffer
+            event (DetectionEvent | AggregatedEvent): Event to buffer
         """
         with self._lock:
-            if len(self._buffer) == self._buffer.maxlen:
-                dropped = self._buffer[0]
-                log(
-                    "[BUFFER] Cola llena. Evento descartado:",
-                    f"frame_id={dropped.frame_id} "
-                    f"type={dropped.entity_type} "
-                    f"ts={dropped.timestamp}",
-                )
-            self._buffer.append(event)
+            if self._compact(event):
+                return
+            self._append(event)
+            self._open[event.entity_type] = self._intrusion(event)
             log(
                 "[BUFFER] Evento almacenado localmente.",
                 f"Pendientes en buffer: {len(self._buffer)}",
             )
 
-    def flush(self) -> list[DetectionEvent]:
+    def _compact(self, event) -> bool:
+        """Fold event into the open intrusion of its class. Caller holds lock."""
+        window = self.compact_window_s
+        intrusion = self._open.get(event.entity_type)
+        if not window or intrusion is None:
+            return False
+
+        first, aggregate = intrusion
+        last = aggregate if aggregate is not None else first
+        if abs(event.capture_time - last.capture_time) > window:
+            return False
+
+        # An in-flight aggregate was already serialized: start a new one
+        if aggregate is None or id(aggregate) in self._inflight:
+            if isinstance(event, AggregatedEvent):
+                aggregate = event
+            else:
+                aggregate = AggregatedEvent(event)
+            self._append(aggregate)
+            # The first event may just have been evicted to make room
+            if self._open.get(first.entity_type) is intrusion:
+                intrusion[1] = aggregate
+            else:
+                self._open[first.entity_type] = [aggregate, aggregate]
+        elif isinstance(event, AggregatedEvent):
+            aggregate.merge(event)
+        else:
+            aggregate.add(event)
+
+        log(
+            "[BUFFER] Evento compactado.",
+            f"{aggregate.entity_type} x{aggregate.count} "
+            f"(máx conf={aggregate.max_confidence})",
+        )
+        return True
+
+    def _append(self, event) -> None:
+        """Append keeping the intrusion index consistent. Caller holds lock."""
+        if len(self._buffer) == self._buffer.maxlen:
+            dropped = self._buffer.popleft()
+            self._discard(dropped)
+            log(
+                "[BUFFER] Cola llena. Evento descartado:",
+                f"frame_id={dropped.frame_id} "
+                f"type={dropped.entity_type} "
+                f"ts={dropped.timestamp}",
+            )
+        self._seqs[id(event)] = self._next_seq
+        self._next_seq += 1
+        self._buffer.append(event)
+
+    @staticmethod
+    def _intrusion(event) -> list:
+        """Index entry for a record that opens a new intrusion."""
+        if isinstance(event, AggregatedEvent):
+            return [event, event]
+        return [event, None]
+
+    def _forget(self, event) -> None:
+        """Drop index references to an evicted record. Caller holds lock."""
+        intrusion = self._open.get(event.entity_type)
+        if intrusion is None:
+            return
+        first, aggregate = intrusion
+        if first is event and aggregate is not None and aggregate is not event:
+            intrusion[0] = aggregate  # Keep folding into the pending aggregate
+        elif event is first or event is aggregate:
+            del self._open[event.entity_type]
+
+    def _discard(self, event) -> None:
+        """Drop every reference to a record leaving memory. Caller holds lock."""
+        self._forget(event)
+        self._inflight.discard(id(event))
+        self._seqs.pop(id(event), None)
+
+    def _reindex(self) -> None:
+        """Rebuild the open-intrusion index from buffer contents."""
+        self._open = {}
+        for item in self._buffer:
+            intrusion = self._open.get(item.entity_type)
+            if isinstance(item, AggregatedEvent) and intrusion and intrusion[1] is None:
+                intrusion[1] = item
+            else:
+                self._open[item.entity_type] = self._intrusion(item)
+        self._inflight &= {id(item) for item in self._buffer}
+        self._seqs = {id(item): self._seqs[id(item)] for item in self._buffer}
+
+    def resize(self, max_size: int) -> None:
+        """
+        Change capacity, keeping the newest events if shrinking.
+
+        Args:
+            max_size (int): New maximum number of events
+        """
+        with self._lock:
+            dropped = len(self._buffer) - max_size
+            if dropped > 0:
+                log(
+                    "[BUFFER] Capacidad reducida.",
+                    f"{dropped} evento(s) antiguos descartados.",
+                )
+            self._buffer = deque(self._buffer, maxlen=max_size)
+            self._reindex()
+
+    def requeue(self, events: list) -> None:
+        """
+        Put unsent events back at the front, ahead of newer ones.
+
+        Events flush() read from disk go back to disk; the rest go to
+        memory, or to disk if they do not fit.
+
+        Args:
+            events (list): Events in their original order
+        """
+        with self._lock:
+            handed_out, self._handed_out = self._handed_out, {}
+            from_disk = [handed_out[id(e)][1] for e in events
+                         if id(e) in handed_out and handed_out[id(e)][1] is not None]
+            if from_disk:
+                # Still on disk past the offset: rewinding is enough
+                self._spill_offset = min(from_disk)
+                self._spilled += len(from_disk)
+
+            entries = []
+            for event in events:
+                seq, offset = handed_out.get(id(event), (None, None))
+                if offset is not None:
+                    continue
+                if seq is None:
+                    self._first_seq -= 1
+                    seq = self._first_seq
+                entries.append((seq, event))
+            if not entries:
+                return
+            if len(entries) > self._buffer.maxlen - len(self._buffer):
+                self._write_spilled(entries)
+                return
+            for seq, event in entries:
+                self._seqs[id(event)] = seq
+            self._buffer = deque(
+                sorted([*self._buffer, *(e for _, e in entries)],
+                       key=lambda item: self._seqs[id(item)]),
+                maxlen=self._buffer.maxlen,
+            )
+            self._reindex()
+
+    def flush(self, limit: int | None = None) -> list:
+        """
+        Extract the oldest pending events, in memory or spilled.
+
+        Args:
+            limit (int | None): Max events to extract (None = all)
+
+        Returns:
+            list: Extracted events in order
+        """
+        with self._lock:
+            self._handed_out = {}
+            self._compact_spill()
+            disk = self._read_spilled(limit)
+            memory = [(self._seqs[id(i)], i) for i in list(self._buffer)[:limit]]
+            taken = sorted(
+                [(seq, item) for seq, item, _ in disk] + memory,
+                key=lambda entry: entry[0],
+            )[:limit]
+            taken_ids = {id(item) for _, item in taken}
+
+            # Read from disk but not handed out: leave them on disk
+            leftover = [e for e in disk if id(e[1]) not in taken_ids]
+            if leftover:
+                self._spill_offset = leftover[0][2]
+                self._spilled += len(leftover)
+
+            self._handed_out = {id(item): (seq, None) for seq, item in memory}
+            self._handed_out.update(
+                (id(item), (seq, offset)) for seq, item, offset in disk
+            )
+            self._handed_out = {
+                k: v for k, v in self._handed_out.items() if k in taken_ids
+            }
+            for seq, item in memory:
+                if id(item) in taken_ids:
+                    self._discard(item)
+            self._buffer = deque(
+                (i for i in self._buffer if id(i) not in taken_ids),
+                maxlen=self._buffer.maxlen,
+            )
+            if not self._spilled:
+                self._compact_spill()  # Disk drained: delete the file
+            return [item for _, item in taken]
+
+    def checkout(self, limit: int) -> list:
         """
-        Extract all pending events (consumes buffer).
+        Mark up to ``limit`` oldest unsent records as in flight.
+
+        Records stay buffered until remove() is called for them, so an
+        unacknowledged send survives a dropped connection. Spilled
+        records are read back, as many as fit in memory.
 
         Returns:
-            list: All buffered events in order
+            list: Records to transmit, oldest first
         """
         with self._lock:
-            pending = list(self._buffer)
-            self._buffer.clear()
-            return pending
+            if self._spilled:
+                self._restore(min(limit, self._buffer.maxlen - len(self._buffer)))
+            batch = []
+            for item in self._buffer:
+                if len(batch) >= limit:
+                    break
+                if id(item) not in self._inflight:
+                    self._inflight.add(id(item))
+                    batch.append(item)
+            return batch
+
+    def remove(self, event) -> None:
+        """Delete a record once acknowledged (or expired)."""
+        with self._lock:
+            try:
+                self._buffer.remove(event)
+            except ValueError:
+                return  # Already evicted
+            self._discard(event)
+
+    def release_inflight(self) -> None:
+        """Make every in-flight record sendable again (e.g. after reconnect)."""
+        with self._lock:
+            self._inflight.clear()
 
     def pending_count(self) -> int:
         """
         Get current number of pending events.
 
         Returns:
-            int: Number of events in buffer
+            int: Number of events in buffer (in memory + spilled)
         """
         with self._lock:
-            return len(self._buffer)
+            return len(self._buffer) + self._spilled
+
+    def spilled_count(self) -> int:
+        """Number of records currently on disk."""
+        with self._lock:
+            return self._spilled
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by in-memory records."""
+        with self._lock:
+            return sum(event_bytes(item) for item in self._buffer)
+
+    def spill(self, keep: int = 0) -> int:
+        """
+        Move the oldest records to disk, keeping the newest ``keep`` in memory.
+
+        In-flight records and, with compaction on, the open intrusion of
+        each class (its first event and current aggregate) stay in memory.
+
+        Returns:
+            int: Number of records spilled
+        """
+        with self._lock:
+            pinned = set(self._inflight)
+            if self.compact_window_s:
+                for intrusion in self._open.values():
+                    pinned.update(id(i) for i in intrusion if i is not None)
+            movable = [i for i in self._buffer if id(i) not in pinned]
+            victims = movable[: max(0, len(movable) - keep)]
+            if not victims:
+                return 0
+            if not self._write_spilled([(self._seqs[id(i)], i) for i in victims]):
+                return 0
+
+            spilled = {id(item) for item in victims}
+            for item in victims:
+                self._discard(item)
+            self._buffer = deque(
+                (i for i in self._buffer if id(i) not in spilled),
+                maxlen=self._buffer.maxlen,
+            )
+            log(
+                f"[BUFFER] {len(victims)} evento(s) movidos a disco.",
+                f"En disco: {self._spilled}",
+            )
+            return len(victims)
+
+    # ─── Spill file: JSON lines sorted by position, read from an offset ───
+    def _scan_spilled(self) -> None:
+        """Pick up a spill file left by a previous run."""
+        self._spilled = 0
+        self._spill_offset = 0
+        self._disk_max_seq = None
+        try:
+            with open(self._spill_path, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    seq = json.loads(line)["seq"]
+                    self._spilled += 1
+                    self._first_seq = min(self._first_seq, seq)
+                    self._next_seq = max(self._next_seq, seq + 1)
+                    self._disk_max_seq = seq
+        except OSError:
+            pass
+        except (ValueError, KeyError) as e:
+            log(f"[BUFFER] No se pudo leer {self._spill_path}: {e}")
+
+    @staticmethod
+    def _encode(seq: int, item, offset: float) -> bytes:
+        # Absolute capture time, so ages survive a restart
+        return (json.dumps({
+            "seq": seq,
+            "aggregated": isinstance(item, AggregatedEvent),
+            "wall_time": item.capture_time + offset,
+            "data": item.to_dict(),
+        }) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _decode(line: bytes, offset: float) -> tuple:
+        entry = json.loads(line)
+        kind = AggregatedEvent if entry["aggregated"] else DetectionEvent
+        return entry["seq"], kind.from_dict(entry["data"], entry["wall_time"] - offset)
+
+    def _write_spilled(self, entries: list) -> bool:
+        """Add (seq, record) entries to the spill file. Caller holds lock."""
+        if not entries:
+            return True
+        entries = sorted(entries, key=lambda entry: entry[0])
+        offset = time.time() - time.perf_counter()
+        try:
+            if self._disk_max_seq is None or entries[0][0] > self._disk_max_seq:
+                with open(self._spill_path, "ab") as f:
+                    f.writelines(self._encode(seq, i, offset) for seq, i in entries)
+            else:
+                # Older than something on disk: merge into a fresh file
+                tmp = self._spill_path + ".tmp"
+                pending = iter(entries)
+                entry = next(pending, None)
+                with open(self._spill_path, "rb") as src, open(tmp, "wb") as dst:
+                    src.seek(self._spill_offset)
+                    for line in src:
+                        if not line.strip():
+                            continue
+                        seq = json.loads(line)["seq"]
+                        while entry is not None and entry[0] < seq:
+                            dst.write(self._encode(*entry, offset))
+                            entry = next(pending, None)
+                        dst.write(line)
+                    while entry is not None:
+                        dst.write(self._encode(*entry, offset))
+                        entry = next(pending, None)
+                os.replace(tmp, self._spill_path)
+                self._spill_offset = 0
+                self._invalidate_offsets()
+        except (OSError, ValueError, KeyError) as e:
+            log(f"[BUFFER] No se pudo escribir {self._spill_path}: {e}")
+            return False
+
+        self._spilled += len(entries)
+        last = entries[-1][0]
+        if self._disk_max_seq is None or last > self._disk_max_seq:
+            self._disk_max_seq = last
+        self._enforce_spill_max()
+        return True
+
+    def _enforce_spill_max(self) -> None:
+        """Drop the oldest spilled records beyond spill_max. Caller holds lock."""
+        excess = self._spilled - self.spill_max if self.spill_max else 0
+        if excess <= 0:
+            return
+        dropped = 0
+        try:
+            with open(self._spill_path, "rb") as f:
+                f.seek(self._spill_offset)
+                while dropped < excess:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.strip():
+                        dropped += 1
+                self._spill_offset = f.tell()
+        except OSError as e:
+            log(f"[BUFFER] No se pudo leer {self._spill_path}: {e}")
+            return
+        self._spilled -= dropped
+        self._invalidate_offsets()
+        log(
+            "[BUFFER] Disco lleno.",
+            f"{dropped} evento(s) antiguos descartados (máx {self.spill_max}).",
+        )
+
+    def _read_spilled(self, limit: int | None) -> list:
+        """
+        Consume the oldest ``limit`` spilled records (None = all).
+
+        Returns:
+            list: (seq, record, line offset) entries. Caller holds lock.
+        """
+        if not self._spilled or limit == 0:
+            return []
+        offset = time.time() - time.perf_counter()
+        entries = []
+        try:
+            with open(self._spill_path, "rb") as f:
+                f.seek(self._spill_offset)
+                while limit is None or len(entries) < limit:
+                    start = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.strip():
+                        entries.append((*self._decode(line, offset), start))
+                self._spill_offset = f.tell()
+        except (OSError, ValueError, KeyError) as e:
+            log(f"[BUFFER] No se pudo leer {self._spill_path}: {e}")
+            return []
+        self._spilled -= len(entries)
+        return entries
+
+    def _compact_spill(self) -> None:
+        """Delete or shrink the file once its front is consumed. Caller holds lock."""
+        if not self._spill_offset and self._spilled:
+            return
+        try:
+            if not self._spilled:
+                if os.path.exists(self._spill_path):
+                    os.remove(self._spill_path)
+                self._disk_max_seq = None
+            elif self._spill_offset * 2 > os.path.getsize(self._spill_path):
+                tmp = self._spill_path + ".tmp"
+                with open(self._spill_path, "rb") as src, open(tmp, "wb") as dst:
+                    src.seek(self._spill_offset)
+                    for line in src:
+                        dst.write(line)
+                os.replace(tmp, self._spill_path)
+            else:
+                return
+        except OSError as e:
+            log(f"[BUFFER] No se pudo compactar {self._spill_path}: {e}")
+            return
+        self._spill_offset = 0
+        self._invalidate_offsets()
+
+    def _invalidate_offsets(self) -> None:
+        """Handed-out records can no longer be rewound. Caller holds lock."""
+        self._handed_out = {k: (seq, None) for k, (seq, _) in self._handed_out.items()}
+
+    def _restore(self, limit: int) -> None:
+        """Read the oldest spilled records back into memory. Caller holds lock."""
+        self._compact_spill()
+        entries = self._read_spilled(limit)
+        self._compact_spill()
+        if not entries:
+            return
+        for seq, item, _ in entries:
+            self._seqs[id(item)] = seq
+        # Restored records belong to closed intrusions: not indexed in _open
+        self._buffer = deque(
+            sorted([*self._buffer, *(item for _, item, _ in entries)],
+                   key=lambda item: self._seqs[id(item)]),
+            maxlen=self._buffer.maxlen,
+        )
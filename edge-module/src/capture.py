@@ -0,0 +1,357 @@
+"""Camera Sources with Dedicated Decode Threads and Reconnection."""
+
+import os
+import threading
+import time
+
+try:
+    from .shared import log
+    from .memory import frame_bytes
+except ImportError:
+    from shared import log
+    from memory import frame_bytes
+
+
+def parse_source(spec):
+    """
+    Normalize a capture source specification.
+
+    Args:
+        spec (int | str): Device index, "0"-style string, file path or URL
+
+    Returns:
+        int | str: Device index as int, anything else unchanged
+    """
+    if isinstance(spec, int):
+        return spec
+    text = str(spec).strip()
+    return int(text) if text.isdigit() else text
+
+
+def source_kind(source) -> str:
+    """Return "device", "stream" (rtsp/http/…) or "file"."""
+    if isinstance(source, int):
+        return "device"
+    if "://" in source and not source.startswith("file://"):
+        return "stream"
+    return "file"
+
+
+class CaptureSource:
+    """
+    Single capture source read by its own grab/decode thread.
+
+    The thread keeps only the newest decoded frame, so a slow consumer
+    never makes the decoder fall behind the live stream. Disconnects and
+    read errors trigger reconnection with exponential backoff. A stall
+    (no frame, or a stream timestamp that stops advancing, for
+    ``stall_s``) abandons the current connection from the consumer side,
+    because a blocked ``read()`` cannot be interrupted from its own thread.
+    """
+
+    def __init__(
+        self,
+        spec,
+        stall_s: float = 5.0,
+        backoff_s: float = 0.5,
+        backoff_max_s: float = 30.0,
+        width: int = 0,
+        hw_decode: bool = False,
+        placement=None,
+    ):
+        """
+        Initialize source (call start() to begin decoding).
+
+        Args:
+            spec (int | str): Device index, file path or stream URL
+            stall_s (float): Seconds without progress before reconnecting
+            backoff_s (float): First reconnection delay
+            backoff_max_s (float): Maximum reconnection delay
+            width (int): Downscale frames to this width (0 = native)
+            hw_decode (bool): Request any available hardware decoder
+            placement (callable | None): Called as placement(tid, label)
+                at the start of every decode thread (CPU pinning, priority)
+        """
+        self.spec = spec
+        self.source = parse_source(spec)
+        self.kind = source_kind(self.source)
+        self.stall_s = stall_s
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.width = width
+        self.hw_decode = hw_decode
+        self.placement = placement
+        self.decode_tid = None  # Native id of the current decode thread
+
+        self._cond = threading.Condition()
+        self._latest = None  # (seq, timestamp, frame)
+        self._seq = 0
+        self._conn_id = 0
+        self._connected = False
+        self._last_progress = 0.0
+        self._finished = False
+        self._stop = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        """True once a file source reached its end."""
+        return self._finished
+
+    def start(self) -> None:
+        """Start the grab/decode thread."""
+        self._stop.clear()
+        self._spawn()
+
+    def stop(self) -> None:
+        """Stop decoding; the thread releases its capture on exit."""
+        self._stop.set()
+        with self._cond:
+            self._conn_id += 1
+            self._cond.notify_all()
+
+    def _spawn(self) -> None:
+        with self._cond:
+            self._conn_id += 1
+            conn_id = self._conn_id
+            self._connected = False
+        threading.Thread(
+            target=self._grab_loop,
+            args=(conn_id,),
+            name=f"Decode[{self.spec}]",
+            daemon=True,
+        ).start()
+
+    def _current(self, conn_id: int) -> bool:
+        return conn_id == self._conn_id and not self._stop.is_set()
+
+    def _open(self):
+        """Open the underlying capture. Returns None on failure."""
+        import cv2
+
+        params = []
+        if self.hw_decode and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if self.kind == "stream":
+            timeout_ms = int(self.stall_s * 1000)
+            for prop in ("CAP_PROP_OPEN_TIMEOUT_MSEC", "CAP_PROP_READ_TIMEOUT_MSEC"):
+                if hasattr(cv2, prop):
+                    params += [getattr(cv2, prop), timeout_ms]
+
+        cap = cv2.VideoCapture(self.source, cv2.CAP_ANY, params)
+        if not cap.isOpened():
+            cap.release()
+            return None
+
+        if self.kind == "stream":
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if self.width and self.kind == "device":
+            # Let the driver scale down before the frame reaches us
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.width * 3 // 4)
+        return cap
+
+    def _downscale(self, frame):
+        import cv2
+
+        h, w = frame.shape[:2]
+        if not self.width or w <= self.width:
+            return frame
+        height = max(1, h * self.width // w)
+        return cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+
+    def _grab_loop(self, conn_id: int) -> None:
+        """Connect, decode and reconnect until stopped or replaced."""
+        import cv2
+
+        tid = threading.get_native_id()
+        with self._cond:
+            if conn_id == self._conn_id:
+                self.decode_tid = tid
+        if self.placement is not None:
+            self.placement(tid, threading.current_thread().name)
+
+        delay = self.backoff_s
+        while self._current(conn_id):
+            log(f"[CAPTURA] Conectando a {self.spec}…")
+            cap = self._open()
+            if cap is None:
+                log(f"[CAPTURA] ✗ No se pudo abrir {self.spec}. Reintento en {delay:.1f} s")
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.backoff_max_s)
+                continue
+
+            log(f"[CAPTURA] ✓ Fuente {self.spec} abierta ({self.kind})")
+            with self._cond:
+                if conn_id == self._conn_id:
+                    self._connected = True
+                    self._last_progress = time.monotonic()
+
+            frame_period = 0.0
+            if self.kind == "file":
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                frame_period = 1.0 / fps if fps and fps > 0 else 0.0
+            last_pos = None
+            next_due = time.monotonic()
+
+            while self._current(conn_id):
+                ret, frame = cap.read()
+                if not self._current(conn_id):
+                    break
+                if not ret or frame is None:
+                    if self.kind == "file":
+                        log(f"[CAPTURA] Fin del archivo {self.spec}.")
+                        self._finished = True
+                        self._stop.set()
+                    else:
+                        log(f"[CAPTURA] Error al leer {self.spec}. Reconectando…")
+                    break
+
+                now = time.monotonic()
+                pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+                frame = self._downscale(frame)
+                # A repeated stream timestamp is a frozen feed: not progress,
+                # and not worth handing to the consumer again
+                advanced = pos <= 0 or pos != last_pos
+                last_pos = pos
+                if advanced:
+                    with self._cond:
+                        self._last_progress = now
+                        self._seq += 1
+                        self._latest = (self._seq, now, frame)
+                        self._cond.notify_all()
+                    delay = self.backoff_s
+
+                if frame_period:
+                    # Files play at their native rate, like a camera would
+                    next_due += frame_period
+                    self._stop.wait(max(0.0, next_due - time.monotonic()))
+
+            cap.release()
+            if self._current(conn_id):
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.backoff_max_s)
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def _check_stall(self) -> None:
+        """Abandon a connection that stopped making progress."""
+        with self._cond:
+            stalled = (
+                self._connected
+                and not self._stop.is_set()
+                and time.monotonic() - self._last_progress > self.stall_s
+            )
+        if stalled:
+            log(
+                f"[CAPTURA] Fuente {self.spec} detenida "
+                f"(> {self.stall_s:.1f} s sin frames). Reconectando…"
+            )
+            self._spawn()
+
+    def read(self, last_seq: int, timeout: float = 0.1):
+        """
+        Wait for a frame newer than ``last_seq``.
+
+        Also checks for a stalled connection on every call.
+
+        Args:
+            last_seq (int): Sequence number of the last frame consumed
+            timeout (float): Max seconds to wait
+
+        Returns:
+            tuple | None: (seq, timestamp, frame), or None on timeout
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: (self._latest is not None and self._latest[0] != last_seq)
+                or self._stop.is_set(),
+                timeout,
+            )
+            latest = self._latest
+        self._check_stall()
+        if ready and latest is not None and latest[0] != last_seq:
+            return latest
+        return None
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the retained latest frame."""
+        latest = self._latest
+        return frame_bytes(latest[2]) if latest is not None else 0
+
+
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def iter_recorded_frames(
+    path: str,
+    max_frames: int | None = None,
+    stride: int = 1,
+    default_fps: float = 30.0,
+):
+    """
+    Yield frames from a video file or a directory of images, as fast as
+    they decode (no real-time pacing).
+
+    Skipped frames (``stride`` > 1) are grabbed but not decoded.
+
+    Args:
+        path (str): Video file, or directory of .jpg/.png/.bmp frames
+        max_frames (int | None): Stop after this many frames
+        stride (int): Yield every Nth frame
+        default_fps (float): Frame rate for images or videos without one
+
+    Yields:
+        tuple: (frame_index, seconds_into_recording, frame)
+    """
+    import cv2
+
+    if os.path.isdir(path):
+        names = sorted(
+            n for n in os.listdir(path) if n.lower().endswith(_IMAGE_EXTENSIONS)
+        )
+        for index in range(0, len(names[:max_frames]), stride):
+            frame = cv2.imread(os.path.join(path, names[index]))
+            if frame is not None:
+                yield index, index / default_fps, frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise OSError(f"No se pudo abrir {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or default_fps
+    try:
+        index = 0
+        while max_frames is None or index < max_frames:
+            if index % stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index, index / fps, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def capture_spec(cfg):
+    """Return the configured source: CAMERA_SOURCE, else CAMERA_INDEX."""
+    return cfg.CAMERA_SOURCE or cfg.CAMERA_INDEX
+
+
+def open_source(cfg, placement=None) -> CaptureSource:
+    """Create and start a CaptureSource from a config snapshot."""
+    source = CaptureSource(
+        capture_spec(cfg),
+        stall_s=cfg.CAPTURE_STALL_S,
+        backoff_s=cfg.RECONNECT_BACKOFF_S,
+        backoff_max_s=cfg.RECONNECT_BACKOFF_MAX_S,
+        width=cfg.CAPTURE_WIDTH,
+        hw_decode=cfg.CAPTURE_HW_DECODE,
+        placement=placement,
+    )
+    source.start()
+    return source
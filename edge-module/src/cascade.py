@@ -0,0 +1,195 @@
+"""Two-Stage Detection Cascade: Cheap Candidate Stage, Then Full YOLO."""
+
+import time
+
+try:
+    from .shared import log
+except ImportError:
+    from shared import log
+
+# Crops larger than this fraction of the frame run on the whole frame
+_FULL_FRAME_FRACTION = 0.6
+
+
+class MotionDetector:
+    """
+    Classical first stage: background subtraction on a tiny gray frame.
+
+    Flags moving regions only, so it is cheap but blind to targets that
+    stand still; the cascade's periodic full-model refresh covers those.
+    """
+
+    def __init__(self, width: int = 160):
+        """
+        Initialize detector.
+
+        Args:
+            width (int): Width frames are shrunk to before subtraction
+        """
+        self.width = width
+        self._subtractor = None
+
+    def detect(self, frame, min_area: float) -> list[tuple]:
+        """
+        Return boxes around moving regions.
+
+        Args:
+            frame: Image data (numpy array, BGR)
+            min_area (float): Min region size as a fraction of the frame
+
+        Returns:
+            list: (x1, y1, x2, y2) boxes in full-frame coordinates
+        """
+        import cv2
+
+        h, w = frame.shape[:2]
+        scale = self.width / w
+        small = cv2.resize(
+            frame, (self.width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA
+        )
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        if self._subtractor is None:
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                history=200, varThreshold=25, detectShadows=False
+            )
+        mask = self._subtractor.apply(gray)
+        mask = cv2.dilate(mask, None, iterations=2)
+        contours, _ = cv2.findContours(
+            mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+
+        min_px = min_area * small.shape[0] * small.shape[1]
+        boxes = []
+        for contour in contours:
+            if cv2.contourArea(contour) < min_px:
+                continue
+            x, y, bw, bh = cv2.boundingRect(contour)
+            boxes.append((
+                int(x / scale), int(y / scale),
+                int((x + bw) / scale), int((y + bh) / scale),
+            ))
+        return boxes
+
+
+def candidate_region(boxes: list[tuple], shape, margin: float = 0.2):
+    """
+    Merge candidate boxes into one padded crop.
+
+    Args:
+        boxes (list): Candidate (x1, y1, x2, y2) boxes
+        shape: Frame shape (h, w, …)
+        margin (float): Padding as a fraction of the merged box size
+
+    Returns:
+        tuple | None: Crop box, or None if the whole frame should be used
+    """
+    h, w = shape[:2]
+    x1 = min(b[0] for b in boxes)
+    y1 = min(b[1] for b in boxes)
+    x2 = max(b[2] for b in boxes)
+    y2 = max(b[3] for b in boxes)
+    mx = int((x2 - x1) * margin)
+    my = int((y2 - y1) * margin)
+    x1, y1 = max(0, x1 - mx), max(0, y1 - my)
+    x2, y2 = min(w, x2 + mx), min(h, y2 + my)
+
+    if (x2 - x1) * (y2 - y1) > _FULL_FRAME_FRACTION * w * h:
+        return None
+    return x1, y1, x2, y2
+
+
+def _crop_imgsz(region) -> int:
+    """Network input size for a crop: its long side, multiple of 32, ≤ 640."""
+    x1, y1, x2, y2 = region
+    side = max(x2 - x1, y2 - y1)
+    return min(640, max(160, (side + 31) // 32 * 32))
+
+
+class Cascade:
+    """
+    Run a cheap first stage on every frame and full YOLO only on candidates.
+
+    Stage 1 modes (CASCADE_MODE):
+        "motion" → MotionDetector (classical, no model)
+        "lowres" → Same YOLO at CASCADE_IMGSZ with CASCADE_STAGE1_CONF
+
+    With CASCADE_REGIONS, stage 2 runs on a crop around the candidates
+    at a matching input size; otherwise on the whole frame. Every
+    CASCADE_REFRESH_FRAMES frames stage 2 runs on the full frame anyway.
+    """
+
+    def __init__(self):
+        """Initialize stage state and timing counters."""
+        self._motion = MotionDetector()
+        self._since_full = 0
+        self.stats = {
+            "frames": 0,
+            "stage1_ms": 0.0,
+            "stage2_runs": 0,
+            "stage2_ms": 0.0,
+        }
+
+    def candidates(self, frame, cfg, infer) -> list[tuple]:
+        """Run stage 1 and return candidate boxes."""
+        if cfg.CASCADE_MODE == "motion":
+            return self._motion.detect(frame, cfg.CASCADE_MIN_AREA)
+        detections = infer(
+            frame, cfg, imgsz=cfg.CASCADE_IMGSZ, min_conf=cfg.CASCADE_STAGE1_CONF
+        )
+        return [det["box"] for det in detections]
+
+    def run(self, frame, cfg, infer) -> list[dict]:
+        """
+        Detect Person/Dog through the cascade.
+
+        Args:
+            frame: Image data (numpy array, BGR)
+            cfg (ConfigSnapshot): Per-frame configuration
+            infer: Full-model function ``infer(frame, cfg, imgsz, min_conf)``
+
+        Returns:
+            list: Detections in the same format as run_yolo_inference()
+        """
+        t0 = time.perf_counter()
+        boxes = self.candidates(frame, cfg, infer)
+        t1 = time.perf_counter()
+        self.stats["frames"] += 1
+        self.stats["stage1_ms"] += (t1 - t0) * 1000
+
+        self._since_full += 1
+        refresh = self._since_full >= cfg.CASCADE_REFRESH_FRAMES
+        if not boxes and not refresh:
+            self._report()
+            return []
+
+        region = None
+        if boxes and not refresh and cfg.CASCADE_REGIONS:
+            region = candidate_region(boxes, frame.shape)
+
+        if region is None:
+            self._since_full = 0
+            detections = infer(frame, cfg)
+        else:
+            x1, y1, x2, y2 = region
+            detections = infer(frame[y1:y2, x1:x2], cfg, imgsz=_crop_imgsz(region))
+            for det in detections:
+                bx1, by1, bx2, by2 = det["box"]
+                det["box"] = (bx1 + x1, by1 + y1, bx2 + x1, by2 + y1)
+
+        self.stats["stage2_runs"] += 1
+        self.stats["stage2_ms"] += (time.perf_counter() - t1) * 1000
+        self._report()
+        return detections
+
+    def _report(self) -> None:
+        """Log per-stage timing every 300 frames."""
+        frames = self.stats["frames"]
+        if frames % 300:
+            return
+        runs = self.stats["stage2_runs"]
+        log(
+            f"[CASCADA] Etapa 1: {self.stats['stage1_ms'] / frames:.1f} ms/frame | "
+            f"Etapa 2: {self.stats['stage2_ms'] / max(runs, 1):.1f} ms "
+            f"en {100 * runs / frames:.0f}% de frames"
+        )
@@ -1,5 +1,17 @@
 """Centralized Configuration for Edge Module."""
 
+import json
+import os
+import threading
+from types import MappingProxyType
+
+try:
+    from .shared import log
+    from .scheduling import POLICY_RE, STAGES, valid_cpu_list
+except ImportError:
+    from shared import log
+    from scheduling import POLICY_RE, STAGES, valid_cpu_list
+
 
 class Config:
     """Configuration constants for real-time security detection."""
@@ -21,6 +33,10 @@ class Config:
     # Max capacity of local buffer (network failure tolerance)
     BUFFER_MAX: int = 100
 
+    # Detections of the same class closer than this are folded into one
+    # aggregated record while buffered (0 disables compaction)
+    BUFFER_COMPACT_WINDOW_S: float = 30.0
+
     # Retry interval for failed events
     RETRY_INTERVAL_S: float = 5.0
 
@@ -36,9 +52,408 @@ class Config:
     # Simulate network failure?
     SIMULATE_NETWORK_FAILURE: bool = False
 
+    # Event transport: "http" (one POST per event) or "tcp"
+    # (store-and-forward over a persistent connection with acks)
+    UPLINK_TRANSPORT: str = "http"
+    UPLINK_HOST: str = "localhost"
+    UPLINK_PORT: int = 8883
+
+    # Max events sent and awaiting acknowledgement at once
+    UPLINK_WINDOW: int = 16
+
+    # No ack for this long → connection considered dead
+    UPLINK_ACK_TIMEOUT_S: float = 5.0
+
     # Camera index (try 0, 1, 2, 3 if default doesn't work)
     CAMERA_INDEX: int = 1
 
+    # Capture source overriding CAMERA_INDEX: "rtsp://…", video file or "0"
+    CAMERA_SOURCE: str = ""
+
+    # Seconds without new frames before a source is reconnected
+    CAPTURE_STALL_S: float = 5.0
+
+    # Reconnection backoff (doubles on each failure up to the max)
+    RECONNECT_BACKOFF_S: float = 0.5
+    RECONNECT_BACKOFF_MAX_S: float = 30.0
+
+    # Downscale decoded frames to this width (0 = native resolution)
+    CAPTURE_WIDTH: int = 0
+
+    # Ask OpenCV for any available hardware decoder
+    CAPTURE_HW_DECODE: bool = False
+
     # YOLOv8 COCO class IDs
     YOLO_CLASS_PERSON: int = 0
     YOLO_CLASS_DOG: int = 16
+
+    # ── Detection Cascade ───────────────────────────────────────
+    # "off"    → full YOLO on every frame
+    # "motion" → background subtraction first, YOLO on moving regions
+    # "lowres" → YOLO at CASCADE_IMGSZ first, full YOLO on candidates
+    CASCADE_MODE: str = "off"
+
+    # Stage 1 input size and confidence ("lowres")
+    CASCADE_IMGSZ: int = 320
+    CASCADE_STAGE1_CONF: float = 0.25
+
+    # Smallest moving region, as a fraction of the frame ("motion")
+    CASCADE_MIN_AREA: float = 0.005
+
+    # Run stage 2 on a crop around candidates instead of the whole frame
+    CASCADE_REGIONS: bool = True
+
+    # Full-frame stage 2 at least this often (catches still targets)
+    CASCADE_REFRESH_FRAMES: int = 30
+
+    # ── Thread Placement (Linux) ────────────────────────────────
+    # CPUs per pipeline stage: "0", "2-3", "0,2" ("" = no pinning)
+    CAPTURE_CPUS: str = ""
+    PROCESS_CPUS: str = ""
+    TRANSMIT_CPUS: str = ""
+
+    # Nice value per stage (-20..19, negative needs CAP_SYS_NICE)
+    CAPTURE_NICE: int = 0
+    PROCESS_NICE: int = 0
+    TRANSMIT_NICE: int = 0
+
+    # Scheduling policy per stage: "other", "batch", "idle",
+    # "fifo[:prio]" or "rr[:prio]" (real-time needs CAP_SYS_NICE)
+    CAPTURE_SCHED: str = "other"
+    PROCESS_SCHED: str = "other"
+    TRANSMIT_SCHED: str = "other"
+
+    # ── Profiling ───────────────────────────────────────────────
+    # Sampling profiler (toggle at runtime through the config file)
+    PROFILER_ENABLED: bool = False
+    PROFILER_INTERVAL_MS: float = 5.0
+
+    # Log a per-thread/function report this often (0 = never)
+    PROFILER_REPORT_S: float = 10.0
+
+    # ── Memory Budget ───────────────────────────────────────────
+    # Cap on process RSS in MB (0 = unlimited). Over budget the module
+    # shrinks the frame queue, then downscales frames, then spills
+    # buffered events to disk, and undoes each step below 80%
+    MEMORY_BUDGET_MB: int = 0
+
+    # How often RSS is checked against the budget
+    MEMORY_CHECK_S: float = 1.0
+
+    # Frame width used while memory is tight
+    MEMORY_MIN_FRAME_WIDTH: int = 320
+
+    # JSONL file receiving spilled events
+    SPILL_PATH: str = "edge_spill.jsonl"
+
+    # Max events on disk; the oldest are dropped beyond it (0 = unlimited)
+    SPILL_MAX: int = 10000
+
+    # ── Hot Reload ──────────────────────────────────────────────
+    # JSON file with overrides (env EDGE_CONFIG takes precedence)
+    CONFIG_PATH: str = "edge_config.json"
+
+    # How often the config file is checked for changes
+    CONFIG_POLL_S: float = 1.0
+
+
+# Keys that can only change with a restart (reload keeps the old value)
+RESTART_ONLY = frozenset(
+    {"LIVE_MODE", "CONFIG_PATH", "UPLINK_TRANSPORT", "SPILL_PATH"}
+)
+
+# Prefix for environment overrides, e.g. EDGE_COOLDOWN_S=2.5
+ENV_PREFIX = "EDGE_"
+
+_VALIDATORS = {
+    "FRAME_INTERVAL_S": lambda v: v > 0,
+    "DEADLINE_INTRUSO_MS": lambda v: v > 0,
+    "COOLDOWN_S": lambda v: v >= 0,
+    "BUFFER_MAX": lambda v: v >= 1,
+    "BUFFER_COMPACT_WINDOW_S": lambda v: v >= 0,
+    "RETRY_INTERVAL_S": lambda v: v > 0,
+    "EVENT_EXPIRY_S": lambda v: v > 0,
+    "CONFIDENCE_THRESHOLD": lambda v: 0.0 <= v <= 1.0,
+    "CAMERA_INDEX": lambda v: v >= 0,
+    "CAPTURE_STALL_S": lambda v: v > 0,
+    "RECONNECT_BACKOFF_S": lambda v: v > 0,
+    "RECONNECT_BACKOFF_MAX_S": lambda v: v > 0,
+    "CAPTURE_WIDTH": lambda v: v >= 0,
+    "CONFIG_POLL_S": lambda v: v > 0,
+    "PROFILER_INTERVAL_MS": lambda v: v > 0,
+    "PROFILER_REPORT_S": lambda v: v >= 0,
+    "UPLINK_TRANSPORT": lambda v: v in ("http", "tcp"),
+    "CASCADE_MODE": lambda v: v in ("off", "motion", "lowres"),
+    "CASCADE_IMGSZ": lambda v: v >= 32 and v % 32 == 0,
+    "CASCADE_STAGE1_CONF": lambda v: 0.0 <= v <= 1.0,
+    "CASCADE_MIN_AREA": lambda v: 0.0 <= v <= 1.0,
+    "CASCADE_REFRESH_FRAMES": lambda v: v >= 1,
+    "UPLINK_PORT": lambda v: 0 < v < 65536,
+    "UPLINK_WINDOW": lambda v: v >= 1,
+    "UPLINK_ACK_TIMEOUT_S": lambda v: v > 0,
+    "MEMORY_BUDGET_MB": lambda v: v >= 0,
+    "MEMORY_CHECK_S": lambda v: v > 0,
+    "MEMORY_MIN_FRAME_WIDTH": lambda v: v >= 32,
+    "SPILL_PATH": lambda v: bool(v),
+    "SPILL_MAX": lambda v: v >= 0,
+}
+
+
+# Checks spanning several keys: (predicate over all values, message)
+_CROSS_CHECKS = [
+    (
+        lambda v: v["RECONNECT_BACKOFF_MAX_S"] >= v["RECONNECT_BACKOFF_S"],
+        "RECONNECT_BACKOFF_MAX_S debe ser >= RECONNECT_BACKOFF_S",
+    ),
+]
+
+
+for _stage in STAGES:
+    _VALIDATORS[f"{_stage}_CPUS"] = valid_cpu_list
+    _VALIDATORS[f"{_stage}_NICE"] = lambda v: -20 <= v <= 19
+    _VALIDATORS[f"{_stage}_SCHED"] = lambda v: bool(POLICY_RE.match(v))
+
+
+class ConfigSnapshot:
+    """
+    Immutable view of every Config tunable at one point in time.
+
+    Attribute names mirror Config, so hot paths read ``cfg.COOLDOWN_S``
+    from a snapshot taken once per frame instead of the mutable class.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: dict):
+        object.__setattr__(self, "_values", MappingProxyType(dict(values)))
+
+    def __getattr__(self, name: str):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def replace(self, **changes) -> "ConfigSnapshot":
+        """Return a copy with some values changed."""
+        values = dict(self._values)
+        values.update(changes)
+        return ConfigSnapshot(values)
+
+    def changed_keys(self, other: "ConfigSnapshot") -> set[str]:
+        """Return keys whose values differ from another snapshot."""
+        return {k for k, v in self._values.items() if other._values.get(k) != v}
+
+    def as_dict(self) -> dict:
+        """Return a plain dict copy of all values."""
+        return dict(self._values)
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot({dict(self._values)})"
+
+
+def _coerce(key: str, value):
+    """Convert a raw file/env value to the type declared on Config."""
+    expected = Config.__annotations__[key]
+
+    if isinstance(value, str) and expected is not str:
+        text = value.strip()
+        if expected is bool:
+            if text.lower() in ("1", "true", "yes", "on"):
+                return True
+            if text.lower() in ("0", "false", "no", "off"):
+                return False
+            raise ValueError(f"{key}: valor booleano inválido {value!r}")
+        try:
+            return expected(text)
+        except ValueError:
+            raise ValueError(f"{key}: se esperaba {expected.__name__}, {value!r}") from None
+
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if type(value) is not expected:
+        raise ValueError(f"{key}: se esperaba {expected.__name__}, {value!r}")
+    return value
+
+
+def load_config(path: str | None = None, environ=None) -> ConfigSnapshot:
+    """
+    Build a validated snapshot from defaults, a JSON file and env vars.
+
+    Precedence: environment (``EDGE_<KEY>``) > file > Config defaults.
+    A missing file is not an error; a malformed one is.
+
+    Args:
+        path (str | None): JSON file with overrides
+        environ (dict | None): Environment mapping (defaults to os.environ)
+
+    Returns:
+        ConfigSnapshot: Validated configuration
+
+    Raises:
+        ValueError: Unknown key, wrong type or out-of-range value
+    """
+    environ = os.environ if environ is None else environ
+    values = {k: getattr(Config, k) for k in Config.__annotations__}
+
+    overrides = {}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}: JSON inválido ({e})") from None
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: se esperaba un objeto JSON")
+        overrides.update(data)
+
+    for key in values:
+        env_key = ENV_PREFIX + key
+        if env_key in environ:
+            overrides[key] = environ[env_key]
+
+    for key, raw in overrides.items():
+        if key not in values:
+            raise ValueError(f"Clave de configuración desconocida: {key}")
+        value = _coerce(key, raw)
+        check = _VALIDATORS.get(key)
+        if check is not None and not check(value):
+            raise ValueError(f"{key}: valor fuera de rango {value!r}")
+        values[key] = value
+
+    for check, message in _CROSS_CHECKS:
+        if not check(values):
+            raise ValueError(message)
+    return ConfigSnapshot(values)
+
+
+# Current snapshot; replaced atomically as a single reference assignment
+_current = ConfigSnapshot({k: getattr(Config, k) for k in Config.__annotations__})
+_listeners = []
+_apply_lock = threading.Lock()
+
+
+def get_config() -> ConfigSnapshot:
+    """Return the active configuration snapshot."""
+    return _current
+
+
+def subscribe(listener) -> None:
+    """
+    Register a callback run after each applied reload.
+
+    Args:
+        listener: Callable(old, new, changed_keys)
+    """
+    _listeners.append(listener)
+
+
+def apply_config(snapshot: ConfigSnapshot) -> set[str]:
+    """
+    Make ``snapshot`` the active configuration and notify listeners.
+
+    Restart-only keys keep their current value.
+
+    Returns:
+        set: Keys that changed
+    """
+    global _current
+
+    with _apply_lock:
+        old = _current
+        frozen = {k: getattr(old, k) for k in RESTART_ONLY}
+        ignored = {k for k, v in frozen.items() if getattr(snapshot, k) != v}
+        for key in sorted(ignored):
+            log(f"[CONFIG] {key} requiere reinicio. Cambio ignorado.")
+        snapshot = snapshot.replace(**frozen)
+
+        changed = snapshot.changed_keys(old)
+        if not changed:
+            return changed
+        _current = snapshot
+
+        for key in sorted(changed):
+            log(f"[CONFIG] {key}: {getattr(old, key)!r} → {getattr(snapshot, key)!r}")
+        for listener in list(_listeners):
+            # A failing listener must not stop reloads or the other listeners
+            try:
+                listener(old, snapshot, changed)
+            except Exception as e:
+                log(
+                    f"[CONFIG] Error aplicando cambios en "
+                    f"{getattr(listener, '__qualname__', listener)}: {e}"
+                )
+        return changed
+
+
+class ConfigWatcher:
+    """
+    Poll the config file and apply valid changes at runtime.
+
+    Invalid files are logged and ignored, keeping the previous snapshot.
+    """
+
+    def __init__(self, path: str | None = None):
+        """
+        Load the initial configuration.
+
+        Args:
+            path (str | None): JSON file (defaults to env EDGE_CONFIG
+                or Config.CONFIG_PATH)
+
+        Raises:
+            ValueError: If the initial configuration is invalid
+        """
+        global _current
+
+        self.path = path or os.environ.get("EDGE_CONFIG", Config.CONFIG_PATH)
+        self._mtime = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+        with _apply_lock:
+            _current = load_config(self.path)
+
+    def _stat(self) -> float | None:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        """
+        Reload if the file changed since the last check.
+
+        Returns:
+            bool: True if a new snapshot was applied
+        """
+        mtime = self._stat()
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            snapshot = load_config(self.path)
+        except (ValueError, OSError) as e:
+            log(f"[CONFIG] Recarga rechazada: {e}")
+            return False
+        return bool(apply_config(snapshot))
+
+    def _run(self) -> None:
+        log(f"[CONFIG] Vigilando {self.path}")
+        while not self._stop.wait(get_config().CONFIG_POLL_S):
+            self.check()
+
+    def start(self) -> threading.Thread:
+        """Start the polling thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="Config..........", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stop.set()
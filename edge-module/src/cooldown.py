@@ -0,0 +1,42 @@
+"""Confidence and Per-Class Cooldown Filtering."""
+
+import threading
+
+
+class CooldownFilter:
+    """
+    Decide which detections become events.
+
+    A detection passes if its confidence reaches CONFIDENCE_THRESHOLD and
+    no event of the same class was emitted in the last COOLDOWN_S seconds.
+    Time is supplied by the caller, so live mode can use perf_counter()
+    and batch mode the position in the recording. Thread-safe.
+    """
+
+    def __init__(self):
+        """Initialize empty cooldown state."""
+        self._last_detection: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def check(self, cls: str, confidence: float, now: float, cfg) -> str | None:
+        """
+        Admit or reject one detection (admitting starts its cooldown).
+
+        Args:
+            cls (str): Detected class
+            confidence (float): Detection confidence
+            now (float): Current time in seconds
+            cfg (ConfigSnapshot): Per-frame configuration
+
+        Returns:
+            str | None: None if admitted, otherwise the rejection reason
+        """
+        if confidence < cfg.CONFIDENCE_THRESHOLD:
+            return f"descartado (confianza {confidence} < {cfg.CONFIDENCE_THRESHOLD})"
+
+        with self._lock:
+            ultima = self._last_detection.get(cls)
+            if ultima is not None and (now - ultima) < cfg.COOLDOWN_S:
+                return f"en cooldown (quedan {cfg.COOLDOWN_S - (now - ultima):.2f} s)"
+            self._last_detection[cls] = now
+        return None
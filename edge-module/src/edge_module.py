@@ -6,92 +6,258 @@ import json
 import queue
 
 try:
-    from .config import Config
+    from .config import ConfigWatcher, get_config, subscribe
     from .models import DetectionEvent
     from .buffer import LocalBuffer
+    from .cooldown import CooldownFilter
     from .shared import SharedFrame, log
-    from .inference import run_yolo_inference
+    from .inference import model_memory_bytes, run_yolo_inference
     from .drawing import draw_boxes
     from .network import simulated_http_post
+    from .capture import capture_spec, open_source
+    from .uplink import StreamUplink
+    from .scheduling import DEFAULT_SETTINGS, apply_placement, stage_settings
+    from .profiler import SamplingProfiler
+    from . import memory
 except ImportError:
-    from config import Config
+    from config import ConfigWatcher, get_config, subscribe
     from models import DetectionEvent
     from buffer import LocalBuffer
+    from cooldown import CooldownFilter
     from shared import SharedFrame, log
-    from inference import run_yolo_inference
+    from inference import model_memory_bytes, run_yolo_inference
     from drawing import draw_boxes
     from network import simulated_http_post
+    from capture import capture_spec, open_source
+    from uplink import StreamUplink
+    from scheduling import DEFAULT_SETTINGS, apply_placement, stage_settings
+    from profiler import SamplingProfiler
+    import memory
 
 # Global shared frame (LIVE mode only)
 _shared_frame = SharedFrame()
 
+# Normal depth of the frame queue (shrunk under memory pressure)
+_FRAME_QUEUE_DEPTH = 5
+
+
+def _source_keys(cfg) -> tuple:
+    """Config values that require reopening the capture source."""
+    return (
+        capture_spec(cfg),
+        cfg.CAPTURE_STALL_S,
+        cfg.RECONNECT_BACKOFF_S,
+        cfg.RECONNECT_BACKOFF_MAX_S,
+        cfg.CAPTURE_WIDTH,
+        cfg.CAPTURE_HW_DECODE,
+    )
+
 
 class EdgeModule:
     """Main orchestrator for 3-thread detection system."""
 
     def __init__(self):
         """Initialize edge module with queues and buffers."""
-        self._frame_queue: queue.Queue[tuple] = queue.Queue(maxsize=5)
+        self._frame_queue: queue.Queue[tuple] = queue.Queue(
+            maxsize=_FRAME_QUEUE_DEPTH
+        )
         self._event_queue: queue.Queue[DetectionEvent] = queue.Queue(maxsize=10)
-        self._local_buffer = LocalBuffer()
-        self._last_detection: dict[str, float] = {}
-        self._cooldown_lock = threading.Lock()
+        self._config_watcher = ConfigWatcher()
+        self._local_buffer = LocalBuffer(
+            get_config().BUFFER_MAX, get_config().BUFFER_COMPACT_WINDOW_S
+        )
+        self._cooldown = CooldownFilter()
         self._frame_counter = 0
         self._running = False
+        self._stage_tids: dict[str, int] = {}
+        self._profiler = None
+        self._source = None
+        self._memory_level = memory.LEVEL_NORMAL
+        subscribe(self._on_config_change)
+
+    def _on_config_change(self, old, new, changed: set[str]) -> None:
+        """Apply reloaded values that need more than a per-frame read."""
+        if "BUFFER_MAX" in changed:
+            self._local_buffer.resize(new.BUFFER_MAX)
+        if "BUFFER_COMPACT_WINDOW_S" in changed:
+            self._local_buffer.compact_window_s = new.BUFFER_COMPACT_WINDOW_S
+        if "SPILL_MAX" in changed:
+            self._local_buffer.spill_max = new.SPILL_MAX
+        for stage, tid in list(self._stage_tids.items()):
+            if stage_settings(old, stage) != stage_settings(new, stage):
+                apply_placement(tid, stage, *stage_settings(new, stage))
+        source = self._source
+        if (
+            source is not None
+            and source.decode_tid is not None
+            and stage_settings(old, "CAPTURE") != stage_settings(new, "CAPTURE")
+        ):
+            apply_placement(
+                source.decode_tid, "CAPTURE decode", *stage_settings(new, "CAPTURE")
+            )
+        if any(key.startswith("PROFILER_") for key in changed):
+            self._update_profiler(new)
+
+    # ─── THREAD PLACEMENT & PROFILING ──────────────────────────────
+    def _run_stage(self, stage: str, target) -> None:
+        """Apply the stage's CPU/priority settings, then run its loop."""
+        tid = threading.get_native_id()
+        self._stage_tids[stage] = tid
+        settings = stage_settings(get_config(), stage)
+        if settings != DEFAULT_SETTINGS:
+            apply_placement(tid, stage, *settings)
+        target()
+
+    def _place_decode_thread(self, tid: int, label: str) -> None:
+        """Give a capture source's decode thread the CAPTURE settings."""
+        settings = stage_settings(get_config(), "CAPTURE")
+        if settings != DEFAULT_SETTINGS:
+            apply_placement(tid, label, *settings)
+
+    def _update_profiler(self, cfg) -> None:
+        """Start, stop or retune the sampling profiler from config."""
+        if self._profiler is not None and self._profiler.running:
+            self._profiler.stop()
+            self._profiler.log_report()
+        if not cfg.PROFILER_ENABLED:
+            return
+        self._profiler = SamplingProfiler(
+            cfg.PROFILER_INTERVAL_MS / 1000, cfg.PROFILER_REPORT_S
+        )
+        self._profiler.start()
+
+    def profile_snapshot(self) -> dict | None:
+        """
+        Wall/CPU time per thread and function collected by the profiler.
+
+        Returns:
+            dict | None: SamplingProfiler.snapshot(), or None if never enabled
+        """
+        if self._profiler is None:
+            return None
+        return self._profiler.snapshot()
+
+    # ─── MEMORY BUDGET ─────────────────────────────────────────────
+    def memory_usage(self) -> dict[str, int]:
+        """
+        Current memory footprint per component, in bytes.
+
+        Returns:
+            dict: frame_queue, event_queue, shared_frame, capture,
+                local_buffer, model, and process-wide rss
+        """
+        source = self._source
+        return {
+            "frame_queue": sum(
+                memory.frame_bytes(frame)
+                for _, frame in memory.queue_items(self._frame_queue)
+            ),
+            "event_queue": sum(
+                memory.event_bytes(event)
+                for event in memory.queue_items(self._event_queue)
+            ),
+            "shared_frame": _shared_frame.memory_bytes(),
+            "capture": source.memory_bytes() if source is not None else 0,
+            "local_buffer": self._local_buffer.memory_bytes(),
+            "model": model_memory_bytes(),
+            "rss": memory.process_rss_bytes(),
+        }
+
+    def _frame_width(self, cfg) -> int:
+        """Capture width after applying the memory governor's cap."""
+        if self._memory_level < memory.LEVEL_SMALL_FRAMES:
+            return cfg.CAPTURE_WIDTH
+        if cfg.CAPTURE_WIDTH:
+            return min(cfg.CAPTURE_WIDTH, cfg.MEMORY_MIN_FRAME_WIDTH)
+        return cfg.MEMORY_MIN_FRAME_WIDTH
+
+    def _memory_thread(self) -> None:
+        """Hold RSS under MEMORY_BUDGET_MB by degrading one step at a time."""
+        while self._running:
+            cfg = get_config()
+            time.sleep(cfg.MEMORY_CHECK_S)
+
+            budget = cfg.MEMORY_BUDGET_MB * 1024 * 1024
+            rss = memory.process_rss_bytes()
+            level = self._memory_level
+            if not budget:
+                level = memory.LEVEL_NORMAL
+            elif rss > budget:
+                level = min(level + 1, memory.LEVEL_SPILL)
+            elif rss < 0.8 * budget:
+                level = max(level - 1, memory.LEVEL_NORMAL)
+
+            if level != self._memory_level:
+                self._set_memory_level(level, rss, budget)
+            if level >= memory.LEVEL_SPILL:
+                # New events keep arriving: move them out on every check
+                self._local_buffer.spill()
+
+    def _set_memory_level(self, level: int, rss: int, budget: int) -> None:
+        """Apply or undo degradation steps to reach ``level``."""
+        old = self._memory_level
+        self._memory_level = level
+
+        if level >= memory.LEVEL_SHALLOW_QUEUE > old:
+            dropped = memory.resize_queue(self._frame_queue, 1)
+            if dropped:
+                log(f"[MEMORIA] {dropped} frame(s) en cola descartados.")
+        elif level < memory.LEVEL_SHALLOW_QUEUE <= old:
+            memory.resize_queue(self._frame_queue, _FRAME_QUEUE_DEPTH)
+        # LEVEL_SMALL_FRAMES is read by the capture loop (_frame_width)
+        # and LEVEL_SPILL by the memory thread itself
+
+        usage = self.memory_usage()
+        top = sorted(
+            ((k, v) for k, v in usage.items() if k != "rss"), key=lambda kv: -kv[1]
+        )[:3]
+        limit = f"{budget / 2**20:.0f} MB" if budget else "sin límite"
+        log(
+            f"[MEMORIA] RSS {rss / 2**20:.0f} MB / {limit} → "
+            f"nivel {level} ({memory.LEVEL_NAMES[level]}).",
+            "Mayores: " + ", ".join(f"{k} {v / 2**20:.1f} MB" for k, v in top),
+        )
 
     # ─── THREAD 1: CAPTURE (High Priority) ─────────────────────────
     def _capture_thread(self) -> None:
         """Capture frames from camera (LIVE) or simulate them."""
-        if Config.LIVE_MODE:
+        if get_config().LIVE_MODE:
             self._capture_live()
         else:
             self._capture_simulated()
 
     def _capture_live(self) -> None:
-        """Capture frames from real camera using OpenCV."""
-        import cv2
-
-        cap = None
-        camera_idx = Config.CAMERA_INDEX
-        log(f"[CAPTURA] Intentando abrir cámara en índice {camera_idx}…")
-        cap = cv2.VideoCapture(camera_idx)
-        if cap.isOpened():
-            ret, test_frame = cap.read()
-            if ret and test_frame is not None:
-                log(f"[CAPTURA] ✓ Cámara ABIERTA en índice {camera_idx}")
-                log(
-                    f"[CAPTURA]   Resolución: "
-                    f"{test_frame.shape[1]}x{test_frame.shape[0]}"
-                )
-            else:
-                log(
-                    f"[CAPTURA] ✗ Cámara en índice {camera_idx} "
-                    f"no captura frames"
-                )
-                cap.release()
-                cap = None
-        else:
-            log(
-                f"[CAPTURA] ✗ No se pudo abrir cámara "
-                f"en índice {camera_idx}"
-            )
-
-        if cap is None or not cap.isOpened():
-            log("[CAPTURA] ERROR: No se pudo abrir ninguna cámara disponible.")
-            self._running = False
-            return
+        """Hand off newest frames from the source's decode thread."""
+        cfg = get_config()
+        source = self._source = open_source(cfg, self._place_decode_thread)
+        source_cfg = _source_keys(cfg)
 
         log("[CAPTURA] Leyendo frames en tiempo real…")
         frame_count = 0
+        last_seq = 0
 
         while self._running:
+            cfg = get_config()
+            if _source_keys(cfg) != source_cfg:
+                # Reopen only the camera, the rest of the pipeline keeps going
+                log(f"[CAPTURA] Fuente cambiada a {capture_spec(cfg)}.")
+                source.stop()
+                source = self._source = open_source(cfg, self._place_decode_thread)
+                source_cfg = _source_keys(cfg)
+                last_seq = 0
+            # Picked up by the decode thread on its next frame
+            source.width = self._frame_width(cfg)
+
+            latest = source.read(last_seq, timeout=0.1)
+            if latest is None:
+                if source.finished:
+                    log("[CAPTURA] Fuente agotada. Deteniendo sistema.")
+                    self._running = False
+                continue
+
+            last_seq, _, frame = latest
             self._frame_counter += 1
             frame_count += 1
-            ret, frame = cap.read()
-            if not ret:
-                log("[CAPTURA] Error al leer frame. Reintentando en 1 s…")
-                time.sleep(1.0)
-                continue
 
             if frame_count % 30 == 0:
                 log(
@@ -104,13 +270,15 @@ class EdgeModule:
             except queue.Full:
                 log(f"[CAPTURA] Cola llena. Frame {self._frame_counter} descartado.")
 
-        cap.release()
+        source.stop()
+        self._source = None
         log("[CAPTURA] Cámara liberada. Hilo terminado.")
 
     def _capture_simulated(self) -> None:
         """Simulate camera capture at 30 FPS."""
         log("[CAPTURA] Hilo iniciado. Simulando cámara a 30 FPS…")
         while self._running:
+            cfg = get_config()
             self._frame_counter += 1
             try:
                 self._frame_queue.put_nowait((self._frame_counter, None))
@@ -119,7 +287,7 @@ class EdgeModule:
                     "[CAPTURA] Cola de frames llena. Frame descartado.",
                     f"frame_id={self._frame_counter}",
                 )
-            time.sleep(Config.FRAME_INTERVAL_S)
+            time.sleep(cfg.FRAME_INTERVAL_S)
         log("[CAPTURA] Hilo terminado.")
 
     # ─── THREAD 2: PROCESSING (Medium Priority) ────────────────────
@@ -134,21 +302,22 @@ class EdgeModule:
                 continue
 
             process_start = time.perf_counter()
-            detections = run_yolo_inference(frame_id, frame)
+            cfg = get_config()  # one snapshot per frame
+            detections = run_yolo_inference(frame_id, frame, cfg)
 
-            if Config.LIVE_MODE and frame is not None:
+            if cfg.LIVE_MODE and frame is not None:
                 _shared_frame.write(frame, detections)
 
             if not detections:
                 log(f"[PROCESO] Frame {frame_id}: Sin detecciones.")
                 continue
 
-            self._process_detections(frame_id, detections, process_start)
+            self._process_detections(frame_id, detections, process_start, cfg)
 
         log("[PROCESO] Hilo terminado.")
 
     def _process_detections(
-        self, frame_id: int, detections: list[dict], process_start: float
+        self, frame_id: int, detections: list[dict], process_start: float, cfg
     ) -> None:
         """Apply cooldown and confidence filters."""
         now = time.perf_counter()
@@ -157,23 +326,11 @@ class EdgeModule:
             cls = det["class"]
             confidence = det["confidence"]
 
-            if confidence < Config.CONFIDENCE_THRESHOLD:
-                log(
-                    f"[PROCESO] Frame {frame_id}: {cls} descartado "
-                    f"(confianza {confidence} < {Config.CONFIDENCE_THRESHOLD})"
-                )
+            rejected = self._cooldown.check(cls, confidence, now, cfg)
+            if rejected:
+                log(f"[PROCESO] Frame {frame_id}: {cls} {rejected}")
                 continue
 
-            with self._cooldown_lock:
-                ultima = self._last_detection.get(cls, 0.0)
-                if (now - ultima) < Config.COOLDOWN_S:
-                    log(
-                        f"[PROCESO] Frame {frame_id}: {cls} en cooldown "
-                        f"(quedan {Config.COOLDOWN_S - (now - ultima):.2f} s)"
-                    )
-                    continue
-                self._last_detection[cls] = now
-
             event = DetectionEvent(cls, confidence, frame_id)
             event.capture_time = process_start
 
@@ -193,38 +350,110 @@ class EdgeModule:
     # ─── THREAD 3: TRANSMISSION (Low Priority) ────────────────────
     def _transmit_thread(self) -> None:
         """Transmit events: HTTP POST + buffer retry logic."""
+        if get_config().UPLINK_TRANSPORT == "tcp":
+            self._transmit_stream()
+            return
+
         log("[ENVIO ] Hilo iniciado. Esperando eventos…")
         last_retry = time.perf_counter()
 
         while self._running:
+            cfg = get_config()
             try:
                 event = self._event_queue.get(timeout=0.1)
-                self._send_event(event)
+                self._send_event(event, cfg)
             except queue.Empty:
                 pass
 
             now = time.perf_counter()
-            if (now - last_retry) >= Config.RETRY_INTERVAL_S:
+            if (now - last_retry) >= cfg.RETRY_INTERVAL_S:
                 last_retry = now
-                self._flush_buffer()
+                self._flush_buffer(cfg)
+
+        self._flush_buffer(get_config())
+        log("[ENVIO ] Hilo terminado.")
+
+    def _transmit_stream(self) -> None:
+        """Store-and-forward: buffer every event, send pipelined, drop on ack."""
+        log("[ENVIO ] Hilo iniciado (uplink TCP). Esperando eventos…")
+        uplink = None
+        next_connect = 0.0
+
+        while self._running:
+            cfg = get_config()
+            try:
+                self._local_buffer.push(self._event_queue.get(timeout=0.02))
+            except queue.Empty:
+                pass
 
-        self._flush_buffer()
+            target = (cfg.UPLINK_HOST, cfg.UPLINK_PORT, cfg.UPLINK_ACK_TIMEOUT_S)
+            if uplink is None or (uplink.host, uplink.port, uplink.ack_timeout_s) != target:
+                if uplink is not None:
+                    uplink.close()
+                    self._local_buffer.release_inflight()
+                uplink = StreamUplink(*target)
+                next_connect = 0.0
+
+            now = time.perf_counter()
+            if not uplink.connected:
+                if now < next_connect:
+                    continue
+                if not uplink.connect():
+                    next_connect = now + cfg.RETRY_INTERVAL_S
+                    continue
+                # Anything unacknowledged on the old connection is resent
+                self._local_buffer.release_inflight()
+
+            self._pump_uplink(uplink, cfg)
+
+        if uplink is not None:
+            uplink.close()
         log("[ENVIO ] Hilo terminado.")
 
-    def _send_event(self, event: DetectionEvent) -> None:
+    def _pump_uplink(self, uplink: StreamUplink, cfg) -> None:
+        """Fill the send window from the buffer and process acks."""
+        now = time.perf_counter()
+        room = cfg.UPLINK_WINDOW - uplink.inflight_count
+
+        for event in self._local_buffer.checkout(room):
+            age_s = now - event.capture_time
+            if age_s > cfg.EVENT_EXPIRY_S:
+                self._local_buffer.remove(event)
+                log(
+                    f"[ENVIO ]   Evento expirado (edad {age_s:.0f} s). "
+                    f"Descartado."
+                )
+                continue
+            if not uplink.send(event):
+                break
+
+        for event in uplink.poll_acks(timeout=0.01):
+            self._local_buffer.remove(event)
+            event.sent = True
+            latency_ms = (time.perf_counter() - event.capture_time) * 1000
+            log(
+                f"[ENVIO ]   ack ✓ — {event.entity_type} "
+                f"frame_id={event.frame_id} ({latency_ms:.1f} ms, deadline "
+                f"{'✓ OK' if latency_ms < cfg.DEADLINE_INTRUSO_MS else '✗ EXCEDIDO'})"
+            )
+
+        if not uplink.connected:
+            self._local_buffer.release_inflight()
+
+    def _send_event(self, event: DetectionEvent, cfg) -> None:
         """Attempt to send event via HTTP POST."""
         payload = event.to_dict()
         latency_ms = (time.perf_counter() - event.capture_time) * 1000
 
-        log(f"[ENVIO ] → POST {Config.BACKEND_URL}")
+        log(f"[ENVIO ] → POST {cfg.BACKEND_URL}")
         log(f"[ENVIO ]   Payload : {json.dumps(payload, indent=None)}")
         log(
             f"[ENVIO ]   Latencia desde captura: {latency_ms:.1f} ms "
             f"(deadline "
-            f"{'✓ OK' if latency_ms < Config.DEADLINE_INTRUSO_MS else '✗ EXCEDIDO'})"
+            f"{'✓ OK' if latency_ms < cfg.DEADLINE_INTRUSO_MS else '✗ EXCEDIDO'})"
         )
 
-        success = simulated_http_post(event)
+        success = simulated_http_post(event, cfg)
 
         if success:
             event.sent = True
@@ -236,38 +465,46 @@ class EdgeModule:
             )
             self._local_buffer.push(event)
 
-    def _flush_buffer(self) -> None:
-        """Retry sending all buffered events."""
-        pending = self._local_buffer.flush()
-        if not pending:
+    def _flush_buffer(self, cfg) -> None:
+        """Retry sending buffered events, oldest first, one batch at a time."""
+        total = self._local_buffer.pending_count()
+        if not total:
             return
 
         log(
-            f"[ENVIO ] ── Reintento de buffer: {len(pending)} "
+            f"[ENVIO ] ── Reintento de buffer: {total} "
             f"evento(s) pendientes ──"
         )
-        now = time.perf_counter()
 
-        for event in pending:
-            age_s = now - event.capture_time
-            if age_s > Config.EVENT_EXPIRY_S:
-                log(
-                    f"[ENVIO ]   Evento expirado (edad {age_s:.0f} s). "
-                    f"Descartado."
-                )
-                continue
+        # Batches of BUFFER_MAX keep spilled events on disk until sent
+        while pending := self._local_buffer.flush(cfg.BUFFER_MAX):
+            now = time.perf_counter()
+            for i, event in enumerate(pending):
+                age_s = now - event.capture_time
+                if age_s > cfg.EVENT_EXPIRY_S:
+                    log(
+                        f"[ENVIO ]   Evento expirado (edad {age_s:.0f} s). "
+                        f"Descartado."
+                    )
+                    continue
 
-            success = simulated_http_post(event)
+                success = simulated_http_post(event, cfg)
 
-            if success:
-                event.sent = True
-                log(
-                    f"[ENVIO ]   Reintento ✓ — {event.entity_type} "
-                    f"frame_id={event.frame_id}"
-                )
-            else:
-                self._local_buffer.push(event)
-                log(f"[ENVIO ]   Reintento ✗ — Devuesto al buffer.")
+                if success:
+                    event.sent = True
+                    log(
+                        f"[ENVIO ]   Reintento ✓ — {event.entity_type} "
+                        f"frame_id={event.frame_id}"
+                    )
+                else:
+                    # Network still down: don't hammer it with the rest
+                    self._local_buffer.requeue(pending[i:])
+                    log(
+                        f"[ENVIO ]   Reintento ✗ — "
+                        f"{self._local_buffer.pending_count()} "
+                        f"evento(s) pendientes en el buffer."
+                    )
+                    return
 
     def display_frame_mainthread(self) -> None:
         """Display annotated frames in OpenCV window (main thread)."""
@@ -279,12 +516,18 @@ class EdgeModule:
 
         log("[DISPLAY] Ventana abierta. Presiona 'q' para cerrar.")
 
+        generation = _shared_frame.generation
         while self._running:
-            frame, detections = _shared_frame.read()
-            if frame is None:
-                time.sleep(0.01)
+            latest = _shared_frame.wait_next(generation, timeout=0.03)
+            if latest is None:
+                # No new frame: keep the window responsive, don't re-render
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    log("[DISPLAY] Usuario presionó 'q'. Cerrando…")
+                    self._running = False
+                    break
                 continue
 
+            generation, frame, detections = latest
             frame_count += 1
 
             if frame_count % 30 == 0:
@@ -296,7 +539,8 @@ class EdgeModule:
                 )
                 last_frame_time = now
 
-            annotated = draw_boxes(frame.copy(), detections)
+            # Front slot is owned by this thread until the next wait_next()
+            annotated = draw_boxes(frame, detections)
             cv2.imshow(WINDOW, annotated)
 
             if cv2.waitKey(1) & 0xFF == ord("q"):
@@ -313,28 +557,40 @@ class EdgeModule:
 
         threads = [
             threading.Thread(
-                target=self._capture_thread,
+                target=self._run_stage,
+                args=("CAPTURE", self._capture_thread),
                 name="Captura.........",
                 daemon=True,
             ),
             threading.Thread(
-                target=self._processing_thread,
+                target=self._run_stage,
+                args=("PROCESS", self._processing_thread),
                 name="Procesamiento....",
                 daemon=True,
             ),
             threading.Thread(
-                target=self._transmit_thread,
+                target=self._run_stage,
+                args=("TRANSMIT", self._transmit_thread),
                 name="Transmision.....",
                 daemon=True,
             ),
         ]
 
+        threads.append(
+            threading.Thread(
+                target=self._memory_thread, name="Memoria.........", daemon=True
+            )
+        )
+
         for t in threads:
             t.start()
+        threads.append(self._config_watcher.start())
+        if get_config().PROFILER_ENABLED:
+            self._update_profiler(get_config())
 
         modo = (
             "LIVE (cámara + ventana)"
-            if Config.LIVE_MODE
+            if get_config().LIVE_MODE
             else "SIMULACIÓN"
         )
         log(
@@ -346,3 +602,6 @@ class EdgeModule:
     def stop(self) -> None:
         """Stop all threads gracefully."""
         self._running = False
+        self._config_watcher.stop()
+        if self._profiler is not None:
+            self._profiler.stop()
@@ -0,0 +1,152 @@
+"""Offline Evaluation of the Detection Cascade over Recorded Frames.
+
+Runs the full model on every frame as the reference and the cascade on
+the same frames, then reports per-stage timing and the cascade's
+precision/recall against the full model.
+
+    python evaluate.py clip.mp4 --mode motion
+    python evaluate.py frames_dir/ --mode lowres --max-frames 500
+"""
+
+import argparse
+import os
+import time
+
+from capture import iter_recorded_frames
+from cascade import Cascade
+from config import Config, load_config
+from inference import _get_model, _real_inference
+
+
+def iou(a: tuple, b: tuple) -> float:
+    """Intersection over union of two (x1, y1, x2, y2) boxes."""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (
+        (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    )
+    return inter / union if union > 0 else 0.0
+
+
+def match_detections(
+    reference: list[dict], predicted: list[dict], min_iou: float = 0.5
+) -> dict[str, list[int]]:
+    """
+    Greedily match predictions to reference detections of the same class.
+
+    Returns:
+        dict: class → [true_positives, false_positives, false_negatives]
+    """
+    counts: dict[str, list[int]] = {}
+    unmatched = list(reference)
+
+    for pred in sorted(predicted, key=lambda d: -d["confidence"]):
+        best, best_iou = None, min_iou
+        for ref in unmatched:
+            if ref["class"] != pred["class"]:
+                continue
+            overlap = iou(ref["box"], pred["box"])
+            if overlap >= best_iou:
+                best, best_iou = ref, overlap
+        row = counts.setdefault(pred["class"], [0, 0, 0])
+        if best is None:
+            row[1] += 1
+        else:
+            row[0] += 1
+            unmatched.remove(best)
+
+    for ref in unmatched:
+        counts.setdefault(ref["class"], [0, 0, 0])[2] += 1
+    return counts
+
+
+def evaluate(path: str, mode: str, max_frames: int | None = None) -> dict:
+    """
+    Compare the cascade against the full model over recorded frames.
+
+    Args:
+        path (str): Video file or directory of images
+        mode (str): Cascade stage 1 ("motion" or "lowres")
+        max_frames (int | None): Stop after this many frames
+
+    Returns:
+        dict: Timing totals and per-class match counts
+    """
+    cfg = load_config(os.environ.get("EDGE_CONFIG", Config.CONFIG_PATH))
+    full_cfg = cfg.replace(LIVE_MODE=True, CASCADE_MODE="off")
+    cascade_cfg = cfg.replace(LIVE_MODE=True, CASCADE_MODE=mode)
+    cascade = Cascade()
+    _get_model()  # Load up front so full_ms times inference only
+
+    report = {"frames": 0, "full_ms": 0.0, "counts": {}}
+    for _, _, frame in iter_recorded_frames(path, max_frames):
+        t0 = time.perf_counter()
+        reference = _real_inference(frame, full_cfg)
+        report["full_ms"] += (time.perf_counter() - t0) * 1000
+
+        predicted = cascade.run(frame, cascade_cfg, _real_inference)
+        report["frames"] += 1
+
+        for cls, row in match_detections(reference, predicted).items():
+            total = report["counts"].setdefault(cls, [0, 0, 0])
+            for i in range(3):
+                total[i] += row[i]
+
+    report.update(cascade.stats)
+    return report
+
+
+def print_report(report: dict, mode: str) -> None:
+    """Print timing and accuracy summary."""
+    frames = max(report["frames"], 1)
+    runs = report["stage2_runs"]
+    full_ms = report["full_ms"] / frames
+    cascade_ms = (report["stage1_ms"] + report["stage2_ms"]) / frames
+
+    print("=" * 70)
+    print(f"  EVALUACIÓN DE CASCADA — modo {mode} — {report['frames']} frames")
+    print("=" * 70)
+    print(f"    • YOLO completo        : {full_ms:.1f} ms/frame")
+    print(f"    • Etapa 1              : {report['stage1_ms'] / frames:.1f} ms/frame")
+    print(
+        f"    • Etapa 2              : {report['stage2_ms'] / max(runs, 1):.1f} ms "
+        f"en {100 * runs / frames:.0f}% de frames"
+    )
+    print(
+        f"    • Cascada total        : {cascade_ms:.1f} ms/frame "
+        f"(x{full_ms / cascade_ms if cascade_ms else 0:.2f})"
+    )
+    print()
+    print("  Clase      Precisión   Recall   (vs. YOLO completo)")
+    totals = [0, 0, 0]
+    for cls, (tp, fp, fn) in sorted(report["counts"].items()):
+        for i, v in enumerate((tp, fp, fn)):
+            totals[i] += v
+        print(f"  {cls:<10} {_ratio(tp, tp + fp):>9}   {_ratio(tp, tp + fn):>6}")
+    tp, fp, fn = totals
+    print(f"  {'Total':<10} {_ratio(tp, tp + fp):>9}   {_ratio(tp, tp + fn):>6}")
+    print("=" * 70)
+
+
+def _ratio(num: int, den: int) -> str:
+    return f"{num / den:.3f}" if den else "  —"
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Video file or directory of images")
+    parser.add_argument(
+        "--mode", choices=("motion", "lowres"), default="motion",
+        help="Cascade stage 1",
+    )
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    report = evaluate(args.path, args.mode, args.max_frames)
+    print_report(report, args.mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,16 @@ import random
 import time
 
 try:
-    from .config import Config
+    from .config import get_config
     from .shared import log
+    from .cascade import Cascade
 except ImportError:
-    from config import Config
+    from config import get_config
     from shared import log
+    from cascade import Cascade
 
 
-def run_yolo_inference(frame_id: int, frame=None) -> list[dict]:
+def run_yolo_inference(frame_id: int, frame=None, config=None) -> list[dict]:
     """
     Execute YOLO inference on frame.
 
@@ -21,14 +23,50 @@ def run_yolo_inference(frame_id: int, frame=None) -> list[dict]:
     Args:
         frame_id (int): Frame identifier
         frame: Image data (None in simulation mode)
+        config (ConfigSnapshot | None): Per-frame snapshot (defaults to active)
 
     Returns:
         list: Detections with format [{"class": str, "confidence": float, "box": tuple}]
     """
-    if not Config.LIVE_MODE:
+    cfg = config or get_config()
+    if not cfg.LIVE_MODE:
         return _simulate_inference()
 
-    return _real_inference(frame)
+    if cfg.CASCADE_MODE != "off":
+        if not hasattr(run_yolo_inference, "_cascade"):
+            run_yolo_inference._cascade = Cascade()
+        return run_yolo_inference._cascade.run(frame, cfg, _real_inference)
+
+    return _real_inference(frame, cfg)
+
+
+def run_yolo_inference_batch(
+    frames: list, config=None, cascade: Cascade | None = None
+) -> list[list[dict]]:
+    """
+    Execute YOLO inference on several frames in one model call.
+
+    Used by offline batch analysis; with a cascade enabled the frames
+    go through it one by one.
+
+    Args:
+        frames (list): Image data (numpy arrays, BGR)
+        config (ConfigSnapshot | None): Snapshot to use (defaults to active)
+        cascade (Cascade | None): Cascade state for this frame sequence
+            (defaults to the live pipeline's)
+
+    Returns:
+        list: One detection list per frame, same format as run_yolo_inference()
+    """
+    cfg = config or get_config()
+    if cfg.CASCADE_MODE != "off":
+        if cascade is None:
+            return [run_yolo_inference(i, f, cfg) for i, f in enumerate(frames)]
+        return [cascade.run(frame, cfg, _real_inference) for frame in frames]
+
+    min_conf = cfg.CONFIDENCE_THRESHOLD
+    results = _get_model()(frames, **_model_kwargs(cfg, None, min_conf))
+    return [_to_detections(result, cfg, min_conf) for result in results]
 
 
 def _simulate_inference() -> list[dict]:
@@ -73,7 +111,44 @@ def _simulate_inference() -> list[dict]:
     return detections
 
 
-def _real_inference(frame) -> list[dict]:
+def _get_model():
+    """Return the YOLO model, loading it on first use (singleton pattern)."""
+    from ultralytics import YOLO as _YOLO
+
+    if not hasattr(run_yolo_inference, "_model"):
+        log("[YOLO  ] Cargando modelo yolov8n.pt …")
+        run_yolo_inference._model = _YOLO("yolov8n.pt")
+        log("[YOLO  ] Modelo cargado.")
+    return run_yolo_inference._model
+
+
+def model_memory_bytes() -> int:
+    """Bytes held by the loaded model's parameters (0 if not loaded)."""
+    model = getattr(run_yolo_inference, "_model", None)
+    if model is None:
+        return 0
+    try:
+        return sum(p.numel() * p.element_size() for p in model.model.parameters())
+    except AttributeError:
+        return 0
+
+
+def _model_kwargs(cfg, imgsz: int | None, min_conf: float) -> dict:
+    """Keyword arguments for a model call."""
+    # Class and confidence filters inside the model also shrink NMS work
+    kwargs = {
+        "verbose": False,
+        "classes": [cfg.YOLO_CLASS_PERSON, cfg.YOLO_CLASS_DOG],
+        "conf": min_conf,
+    }
+    if imgsz is not None:
+        kwargs["imgsz"] = imgsz
+    return kwargs
+
+
+def _real_inference(
+    frame, cfg, imgsz: int | None = None, min_conf: float | None = None
+) -> list[dict]:
     """
     Execute real YOLOv8 inference on frame.
 
@@ -81,34 +156,37 @@ def _real_inference(frame) -> list[dict]:
 
     Args:
         frame: Image data (numpy array, BGR)
+        cfg (ConfigSnapshot): Per-frame configuration
+        imgsz (int | None): Network input size (None = model default)
+        min_conf (float | None): Confidence cut-off
+            (defaults to CONFIDENCE_THRESHOLD)
 
     Returns:
         list: Detections filtered to Person/Dog only
     """
-    from ultralytics import YOLO as _YOLO
+    if min_conf is None:
+        min_conf = cfg.CONFIDENCE_THRESHOLD
 
-    # Lazy load model (singleton pattern)
-    if not hasattr(run_yolo_inference, "_model"):
-        log("[YOLO  ] Cargando modelo yolov8n.pt …")
-        run_yolo_inference._model = _YOLO("yolov8n.pt")
-        log("[YOLO  ] Modelo cargado.")
+    results = _get_model()(frame, **_model_kwargs(cfg, imgsz, min_conf))[0]
+    return _to_detections(results, cfg, min_conf)
 
-    results = run_yolo_inference._model(frame, verbose=False)[0]
 
+def _to_detections(results, cfg, min_conf: float) -> list[dict]:
+    """Convert one YOLO result to Person/Dog detections."""
     detections = []
     for box in results.boxes:
         cls_id = int(box.cls[0].item())
 
         # Filter to Person and Dog only
-        if cls_id not in (Config.YOLO_CLASS_PERSON, Config.YOLO_CLASS_DOG):
+        if cls_id not in (cfg.YOLO_CLASS_PERSON, cfg.YOLO_CLASS_DOG):
             continue
 
         conf = round(float(box.conf[0].item()), 3)
-        if conf < Config.CONFIDENCE_THRESHOLD:
+        if conf < min_conf:
             continue
 
         x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
-        label = "Person" if cls_id == Config.YOLO_CLASS_PERSON else "Dog"
+        label = "Person" if cls_id == cfg.YOLO_CLASS_PERSON else "Dog"
 
         detections.append({
             "class": label,
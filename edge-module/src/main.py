@@ -1,15 +1,16 @@
 """Entry Point for Edge Module Application."""
 
-from config import Config
+from config import get_config
 from edge_module import EdgeModule
 from shared import log
 
 
 def print_header():
     """Print startup information."""
+    cfg = get_config()
     modo_texto = (
         "LIVE (cámara real + ventana)"
-        if Config.LIVE_MODE
+        if cfg.LIVE_MODE
         else "SIMULACIÓN (sin cámara ni red)"
     )
 
@@ -19,19 +20,20 @@ def print_header():
     print("=" * 70)
     print()
     print("  Config actual:")
-    print(f"    • Modo                  : {'LIVE' if Config.LIVE_MODE else 'SIMULADO'}")
+    print(f"    • Modo                  : {'LIVE' if cfg.LIVE_MODE else 'SIMULADO'}")
     print(
-        f"    • FPS                   : {int(1 / Config.FRAME_INTERVAL_S)} "
-        f"{'(simulado)' if not Config.LIVE_MODE else '(cámara real)'}"
+        f"    • FPS                   : {int(1 / cfg.FRAME_INTERVAL_S)} "
+        f"{'(simulado)' if not cfg.LIVE_MODE else '(cámara real)'}"
     )
-    print(f"    • Deadline intruso      : {Config.DEADLINE_INTRUSO_MS} ms")
-    print(f"    • Cooldown por entidad  : {Config.COOLDOWN_S} s")
-    print(f"    • Buffer máximo         : {Config.BUFFER_MAX} eventos")
-    print(f"    • Fallo de red simulado : {Config.SIMULATE_NETWORK_FAILURE}")
-    print(f"    • Backend URL (sim)     : {Config.BACKEND_URL}")
+    print(f"    • Deadline intruso      : {cfg.DEADLINE_INTRUSO_MS} ms")
+    print(f"    • Cooldown por entidad  : {cfg.COOLDOWN_S} s")
+    print(f"    • Buffer máximo         : {cfg.BUFFER_MAX} eventos")
+    print(f"    • Fallo de red simulado : {cfg.SIMULATE_NETWORK_FAILURE}")
+    print(f"    • Backend URL (sim)     : {cfg.BACKEND_URL}")
+    print(f"    • Config en caliente    : {cfg.CONFIG_PATH} (o env EDGE_CONFIG)")
     print()
 
-    if Config.LIVE_MODE:
+    if cfg.LIVE_MODE:
         print("  LIVE: Se abrirá una ventana con la cámara.")
         print("        Azul  = Person | Verde = Dog")
         print("        Presiona 'q' en la ventana para cerrarla.")
@@ -41,7 +43,7 @@ def print_header():
         print("    • Para ver la cámara real, cambia Config.LIVE_MODE = True")
         print("      (requiere: pip install opencv-python ultralytics)")
         print("    • Para ver el buffer en acción, cambia")
-        print("      Config.SIMULATE_NETWORK_FAILURE = True")
+        print("      SIMULATE_NETWORK_FAILURE en edge_config.json (sin reiniciar)")
 
     print("=" * 70)
     print()
@@ -49,9 +51,13 @@ def print_header():
 
 def main():
     """Main entry point."""
-    print_header()
+    try:
+        edge = EdgeModule()
+    except ValueError as e:
+        log(f"[MAIN  ] Configuración inválida: {e}")
+        return
 
-    edge = EdgeModule()
+    print_header()
     threads = edge.start()
 
     log("[MAIN  ] Sistema iniciado. Esperando datos de cámara…")
@@ -60,7 +66,7 @@ def main():
     print()
 
     try:
-        if Config.LIVE_MODE:
+        if get_config().LIVE_MODE:
             edge.display_frame_mainthread()
         else:
             # Simulation mode: just wait
@@ -0,0 +1,77 @@
+"""Memory Accounting Helpers for the Bounded-Memory Mode."""
+
+import os
+import sys
+
+# Degradation steps, applied in order while RSS is over budget
+LEVEL_NORMAL = 0
+LEVEL_SHALLOW_QUEUE = 1   # frame queue depth → 1
+LEVEL_SMALL_FRAMES = 2    # + retained frames downscaled
+LEVEL_SPILL = 3           # + buffered events spilled to disk
+
+LEVEL_NAMES = {
+    LEVEL_NORMAL: "normal",
+    LEVEL_SHALLOW_QUEUE: "cola de frames mínima",
+    LEVEL_SMALL_FRAMES: "frames reducidos",
+    LEVEL_SPILL: "eventos a disco",
+}
+
+
+def process_rss_bytes() -> int:
+    """
+    Resident set size of this process.
+
+    Reads /proc/self/statm on Linux; elsewhere falls back to the peak
+    RSS from getrusage (an upper bound).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def frame_bytes(frame) -> int:
+    """Bytes held by a frame (numpy array), 0 for None."""
+    return int(getattr(frame, "nbytes", 0))
+
+
+def event_bytes(event) -> int:
+    """Approximate bytes held by an event object and its attributes."""
+    attrs = vars(event)
+    return (
+        sys.getsizeof(event)
+        + sys.getsizeof(attrs)
+        + sum(sys.getsizeof(v) for v in attrs.values())
+    )
+
+
+def queue_items(q) -> list:
+    """Snapshot of a queue.Queue's contents."""
+    with q.mutex:
+        return list(q.queue)
+
+
+def resize_queue(q, maxsize: int) -> int:
+    """
+    Change a queue.Queue's capacity, dropping the oldest overflow.
+
+    Returns:
+        int: Number of items dropped
+    """
+    with q.mutex:
+        q.maxsize = maxsize
+        dropped = 0
+        while maxsize > 0 and len(q.queue) > maxsize:
+            q.queue.popleft()
+            dropped += 1
+        q.not_full.notify_all()
+        return dropped
@@ -44,6 +44,15 @@ class DetectionEvent:
             "timestamp": self.timestamp,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict, capture_time: float) -> "DetectionEvent":
+        """Rebuild an event from to_dict() output (e.g. spilled to disk)."""
+        event = cls(data["entity_type"], data["confidence"], data["frame_id"])
+        event.id = data["event_id"]
+        event.timestamp = data["timestamp"]
+        event.capture_time = capture_time
+        return event
+
     def __repr__(self) -> str:
         return (
             f"DetectionEvent(id={self.id}, "
@@ -51,3 +60,91 @@ class DetectionEvent:
             f"conf={self.confidence}, "
             f"frame={self.frame_id})"
         )
+
+
+class AggregatedEvent:
+    """
+    Repeated detections of one class folded into a single record.
+
+    Built by LocalBuffer while the network is down. The first detection
+    of an intrusion stays a plain DetectionEvent; every later one inside
+    the compaction window is counted here.
+    """
+
+    def __init__(self, event: DetectionEvent):
+        """
+        Start an aggregate from one detection.
+
+        Args:
+            event (DetectionEvent): First detection folded into the record
+        """
+        self.id = id(self)
+        self.entity_type = event.entity_type
+        self.count = 1
+        self.max_confidence = event.confidence
+        self.first_frame_id = event.frame_id
+        self.frame_id = event.frame_id
+        self.first_seen = event.timestamp
+        self.timestamp = event.timestamp
+        self.capture_time = event.capture_time
+        self.sent = False
+
+    @property
+    def confidence(self) -> float:
+        """Highest confidence among folded detections."""
+        return self.max_confidence
+
+    def add(self, event: DetectionEvent) -> None:
+        """Fold one more detection into the record."""
+        self.count += 1
+        self.max_confidence = max(self.max_confidence, event.confidence)
+        self.first_frame_id = min(self.first_frame_id, event.frame_id)
+        self.first_seen = min(self.first_seen, event.timestamp)
+        if event.capture_time >= self.capture_time:
+            self.frame_id = event.frame_id
+            self.timestamp = event.timestamp
+            self.capture_time = event.capture_time
+
+    def merge(self, other: "AggregatedEvent") -> None:
+        """Fold another aggregate of the same class into this one."""
+        self.count += other.count
+        self.max_confidence = max(self.max_confidence, other.max_confidence)
+        self.first_frame_id = min(self.first_frame_id, other.first_frame_id)
+        self.first_seen = min(self.first_seen, other.first_seen)
+        if other.capture_time > self.capture_time:
+            self.frame_id = other.frame_id
+            self.timestamp = other.timestamp
+            self.capture_time = other.capture_time
+
+    def to_dict(self) -> dict:
+        """Serialize aggregate to dictionary for transmission."""
+        return {
+            "event_id": self.id,
+            "entity_type": self.entity_type,
+            "aggregated": True,
+            "count": self.count,
+            "confidence": self.max_confidence,
+            "first_frame_id": self.first_frame_id,
+            "frame_id": self.frame_id,
+            "first_seen": self.first_seen,
+            "timestamp": self.timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, capture_time: float) -> "AggregatedEvent":
+        """Rebuild an aggregate from to_dict() output (e.g. spilled to disk)."""
+        first = DetectionEvent.from_dict(data, capture_time)
+        aggregate = cls(first)
+        aggregate.id = data["event_id"]
+        aggregate.count = data["count"]
+        aggregate.first_frame_id = data["first_frame_id"]
+        aggregate.first_seen = data["first_seen"]
+        return aggregate
+
+    def __repr__(self) -> str:
+        return (
+            f"AggregatedEvent(type={self.entity_type}, "
+            f"count={self.count}, "
+            f"max_conf={self.max_confidence}, "
+            f"frames={self.first_frame_id}..{self.frame_id})"
+        )
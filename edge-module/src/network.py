@@ -4,12 +4,12 @@ import time
 import random
 
 try:
-    from .config import Config
+    from .config import get_config
 except ImportError:
-    from config import Config
+    from config import get_config
 
 
-def simulated_http_post(event) -> bool:
+def simulated_http_post(event, config=None) -> bool:
     """
     Simulate HTTP POST to backend.
 
@@ -17,11 +17,13 @@ def simulated_http_post(event) -> bool:
 
     Args:
         event: DetectionEvent to send
+        config (ConfigSnapshot | None): Snapshot to use (defaults to active)
 
     Returns:
         bool: True if successful, False if network failure
     """
-    if Config.SIMULATE_NETWORK_FAILURE:
+    cfg = config or get_config()
+    if cfg.SIMULATE_NETWORK_FAILURE:
         return False
 
     # Simulate network latency (5-20 ms)
@@ -0,0 +1,164 @@
+"""Sampling Profiler Attributing Wall and CPU Time per Thread and Function."""
+
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+try:
+    from .shared import log
+except ImportError:
+    from shared import log
+
+
+def _thread_cpu_time(ident: int) -> float | None:
+    """CPU seconds consumed by one thread, or None if unavailable."""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Periodically sample every thread's current function.
+
+    Each sample credits the elapsed wall time, and the CPU time the
+    thread used since the previous sample, to the function it is
+    running. Sampling runs in its own thread with no tracing hooks, so
+    the overhead stays small and can be toggled while the system runs.
+    """
+
+    def __init__(self, interval_s: float = 0.005, report_s: float = 0.0):
+        """
+        Initialize profiler (call start() to begin sampling).
+
+        Args:
+            interval_s (float): Seconds between samples
+            report_s (float): Log a report this often (0 = never)
+        """
+        self.interval_s = interval_s
+        self.report_s = report_s
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_cpu: dict[int, float] = {}  # Kept across resets
+        self.reset()
+
+    @property
+    def running(self) -> bool:
+        """True while sampling."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def reset(self) -> None:
+        """Discard collected samples."""
+        with self._lock:
+            self._wall = defaultdict(lambda: defaultdict(float))
+            self._cpu = defaultdict(lambda: defaultdict(float))
+            self._cpu_total = defaultdict(float)
+            self._elapsed = 0.0
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="Perfilador......", daemon=True
+        )
+        self._thread.start()
+        log(f"[PERFIL] Activado (muestreo cada {self.interval_s * 1000:.1f} ms).")
+
+    def stop(self) -> None:
+        """Stop sampling (collected data is kept)."""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        log("[PERFIL] Desactivado.")
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        last = time.perf_counter()
+        last_report = last
+
+        while not self._stop.wait(self.interval_s):
+            now = time.perf_counter()
+            self._sample(now - last, me)
+            last = now
+            if self.report_s and now - last_report >= self.report_s:
+                last_report = now
+                self.log_report()
+                self.reset()
+
+    def _sample(self, dt: float, me: int) -> None:
+        frames = sys._current_frames()
+        names = {t.ident: t.name for t in threading.enumerate()}
+
+        with self._lock:
+            self._elapsed += dt
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                name = names.get(ident, str(ident))
+                func = _label(frame)
+                self._wall[name][func] += dt
+
+                cpu = _thread_cpu_time(ident)
+                if cpu is None:
+                    continue
+                prev = self._last_cpu.get(ident)
+                self._last_cpu[ident] = cpu
+                if prev is not None and cpu >= prev:
+                    self._cpu[name][func] += cpu - prev
+                    self._cpu_total[name] += cpu - prev
+
+    def snapshot(self) -> dict:
+        """
+        Return collected times.
+
+        Returns:
+            dict: {"elapsed_s": float, "threads": {name: {"cpu_s": float,
+                "functions": {func: {"wall_s": float, "cpu_s": float}}}}}
+        """
+        with self._lock:
+            threads = {}
+            for name, funcs in self._wall.items():
+                threads[name] = {
+                    "cpu_s": self._cpu_total.get(name, 0.0),
+                    "functions": {
+                        func: {"wall_s": wall, "cpu_s": self._cpu[name].get(func, 0.0)}
+                        for func, wall in funcs.items()
+                    },
+                }
+            return {"elapsed_s": self._elapsed, "threads": threads}
+
+    def log_report(self, top: int = 5) -> None:
+        """Log CPU use per thread and its top functions by CPU time."""
+        data = self.snapshot()
+        elapsed = data["elapsed_s"]
+        if not elapsed:
+            return
+
+        log(f"[PERFIL] ── Últimos {elapsed:.1f} s ──")
+        threads = sorted(data["threads"].items(), key=lambda kv: -kv[1]["cpu_s"])
+        for name, info in threads:
+            log(
+                f"[PERFIL] {name}: CPU {100 * info['cpu_s'] / elapsed:.1f}% "
+                f"({info['cpu_s']:.2f} s)"
+            )
+            funcs = sorted(
+                info["functions"].items(),
+                key=lambda kv: (-kv[1]["cpu_s"], -kv[1]["wall_s"]),
+            )
+            for func, t in funcs[:top]:
+                log(
+                    f"[PERFIL]     {100 * t['wall_s'] / elapsed:5.1f}% wall "
+                    f"{t['cpu_s']:6.2f} s CPU  {func}"
+                )
@@ -0,0 +1,122 @@
+"""CPU Affinity, Nice and Scheduling Policy for Pipeline Threads (Linux)."""
+
+import os
+import re
+
+try:
+    from .shared import log
+except ImportError:
+    from shared import log
+
+# Pipeline stages and their Config key prefixes
+STAGES = ("CAPTURE", "PROCESS", "TRANSMIT")
+
+_POLICIES = {
+    "other": "SCHED_OTHER",
+    "batch": "SCHED_BATCH",
+    "idle": "SCHED_IDLE",
+    "fifo": "SCHED_FIFO",
+    "rr": "SCHED_RR",
+}
+
+CPU_LIST_RE = re.compile(r"^\s*(\d+(-\d+)?)(\s*,\s*\d+(-\d+)?)*\s*$")
+POLICY_RE = re.compile(r"^(other|batch|idle|fifo|rr)(:\d{1,2})?$")
+
+
+def parse_cpus(text: str) -> set[int]:
+    """
+    Parse a CPU list like "0", "2-3" or "0,2-3".
+
+    Returns:
+        set: CPU numbers (empty = no pinning)
+    """
+    cpus: set[int] = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.update(range(int(lo), int(hi) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def valid_cpu_list(text: str) -> bool:
+    """True for "" or a CPU list whose ranges are all ascending."""
+    if not text:
+        return True
+    if not CPU_LIST_RE.match(text):
+        return False
+    for part in text.replace(" ", "").split(","):
+        lo, _, hi = part.partition("-")
+        if hi and int(lo) > int(hi):
+            return False
+    return True
+
+
+# Settings that mean "leave the thread as the OS started it"
+DEFAULT_SETTINGS = ("", 0, "other")
+
+
+def stage_settings(cfg, stage: str) -> tuple:
+    """(cpus, nice, policy) for a stage from a config snapshot."""
+    return (
+        getattr(cfg, f"{stage}_CPUS"),
+        getattr(cfg, f"{stage}_NICE"),
+        getattr(cfg, f"{stage}_SCHED"),
+    )
+
+
+def apply_placement(tid: int, label: str, cpus: str, nice: int, policy: str) -> None:
+    """
+    Pin a thread to CPUs and set its nice value and scheduling policy.
+
+    Linux applies all three per thread, addressed by native thread id,
+    so this may be called from any thread. Unsupported platforms and
+    missing privileges are logged, never raised.
+
+    Args:
+        tid (int): threading.get_native_id() of the target thread
+        label (str): Name used in logs
+        cpus (str): CPU list ("" = any CPU the process may use)
+        nice (int): Nice value (-20..19)
+        policy (str): "other", "batch", "idle", "fifo[:prio]" or "rr[:prio]"
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        if cpus or nice or policy != "other":
+            log(f"[SCHED ] {label}: afinidad/prioridad no soportada en esta plataforma.")
+        return
+
+    try:
+        # "" un-pins: back to the CPUs the process (main thread) may use
+        allowed = os.sched_getaffinity(os.getpid())
+        wanted = parse_cpus(cpus) & allowed if cpus else allowed
+        if not wanted:
+            log(f"[SCHED ] {label}: CPUs {cpus} no disponibles. Se ignora.")
+        else:
+            os.sched_setaffinity(tid, wanted)
+
+        name, _, prio = policy.partition(":")
+        os.sched_setscheduler(
+            tid,
+            getattr(os, _POLICIES[name]),
+            os.sched_param(int(prio or 1) if name in ("fifo", "rr") else 0),
+        )
+
+        # Nice only matters for normal policies, but is harmless otherwise
+        os.setpriority(os.PRIO_PROCESS, tid, nice)
+    except PermissionError:
+        log(
+            f"[SCHED ] {label}: sin permisos para política {policy} "
+            f"/ nice {nice} (requiere CAP_SYS_NICE)."
+        )
+        return
+    except OSError as e:
+        log(f"[SCHED ] {label}: no se pudo aplicar ({e}).")
+        return
+
+    log(
+        f"[SCHED ] {label}: CPUs={sorted(os.sched_getaffinity(tid))} "
+        f"nice={nice} política={policy}"
+    )
@@ -3,26 +3,98 @@
 import threading
 from datetime import datetime
 
+try:
+    from .memory import frame_bytes
+except ImportError:
+    from memory import frame_bytes
+
 
 class SharedFrame:
-    """Thread-safe container for latest frame and detections."""
+    """
+    Triple-buffered exchange for the latest frame and detections.
+
+    Three slots rotate between the writer (back), the reader (front) and
+    the most recently published frame (ready). Publishing and acquiring
+    only swap slot indices under a short condition lock, so the writer
+    never waits for the display to finish rendering and no data is copied.
+    Every publish bumps a generation counter; readers block on the
+    condition until a newer generation exists instead of polling.
+    """
 
     def __init__(self):
-        """Initialize shared frame container."""
-        self.frame = None
-        self.detections = []
-        self._lock = threading.Lock()
+        """Initialize the three slots and the generation counter."""
+        self._slots: list[tuple] = [(None, []), (None, []), (None, [])]
+        self._back = 0
+        self._ready = 1
+        self._front = 2
+        self._generation = 0
+        self._front_generation = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    @property
+    def generation(self) -> int:
+        """Generation number of the most recently published frame."""
+        return self._generation
 
     def write(self, frame, detections: list[dict]) -> None:
-        """Write frame and detections atomically."""
-        with self._lock:
-            self.frame = frame
-            self.detections = detections
+        """
+        Publish frame and detections as a new generation.
+
+        The caller hands ownership of both objects to the container and
+        must not mutate them afterwards.
+        """
+        self._slots[self._back] = (frame, detections)
+        with self._cond:
+            self._back, self._ready = self._ready, self._back
+            self._generation += 1
+            self._cond.notify_all()
+
+    def wait_next(self, last_generation: int, timeout: float | None = None):
+        """
+        Block until a generation newer than ``last_generation`` is ready.
+
+        The returned slot belongs to the reader until its next call, so
+        the frame may be annotated in place.
+
+        Args:
+            last_generation (int): Generation the caller already rendered
+            timeout (float | None): Max seconds to wait
+
+        Returns:
+            tuple | None: (generation, frame, detections), or None on timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._generation != last_generation, timeout
+            ):
+                return None
+            if self._front_generation != self._generation:
+                self._front, self._ready = self._ready, self._front
+                self._front_generation = self._generation
+            frame, detections = self._slots[self._front]
+            return self._front_generation, frame, detections
 
     def read(self):
-        """Read frame and detections atomically."""
-        with self._lock:
-            return self.frame, list(self.detections)
+        """
+        Peek at the latest frame and detections without waiting.
+
+        Unlike wait_next() this never swaps slots, so it cannot take the
+        front slot away from the reader that owns it. The returned objects
+        are shared: do not modify them (the display may be drawing on the
+        frame).
+        """
+        with self._cond:
+            if self._generation == 0:
+                return None, []
+            if self._front_generation == self._generation:
+                return self._slots[self._front]
+            return self._slots[self._ready]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the distinct frames in the three slots."""
+        with self._cond:
+            frames = {id(f): f for f, _ in self._slots if f is not None}
+        return sum(frame_bytes(f) for f in frames.values())
 
 
 # Global logger lock
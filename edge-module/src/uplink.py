@@ -0,0 +1,297 @@
+"""Store-and-Forward Event Uplink over a Persistent TCP Connection.
+
+Wire format: every message is a 4-byte big-endian length followed by a
+UTF-8 JSON body.
+
+    client → server   {"type": "event", "seq": 7, "payload": {...}}
+    server → client   {"type": "ack", "seq": 7}
+
+Delivery is at-least-once (MQTT QoS 1 style): events stay in LocalBuffer
+until acknowledged and are resent after a reconnect, so the backend must
+deduplicate by ``event_id``.
+"""
+
+import json
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+try:
+    from .shared import log
+except ImportError:
+    from shared import log
+
+_HEADER = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 1 << 20
+
+
+def encode_message(message: dict) -> bytes:
+    """Serialize one message with its length prefix."""
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+class MessageDecoder:
+    """Incremental decoder for length-prefixed messages."""
+
+    def __init__(self):
+        self._data = bytearray()
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        """
+        Add received bytes and return every complete message.
+
+        Raises:
+            ValueError: Message larger than MAX_MESSAGE_BYTES
+        """
+        self._data += chunk
+        messages = []
+        while len(self._data) >= _HEADER.size:
+            (size,) = _HEADER.unpack_from(self._data)
+            if size > MAX_MESSAGE_BYTES:
+                raise ValueError(f"Mensaje demasiado grande ({size} bytes)")
+            end = _HEADER.size + size
+            if len(self._data) < end:
+                break
+            messages.append(json.loads(self._data[_HEADER.size:end]))
+            del self._data[:end]
+        return messages
+
+
+class StreamUplink:
+    """
+    Client side of the uplink, driven from the transmission thread.
+
+    Sends are pipelined (no waiting per event); ``poll_acks()`` returns
+    the events the server confirmed. Nothing here blocks for longer than
+    the socket timeout, and no extra thread is used.
+    """
+
+    def __init__(self, host: str, port: int, ack_timeout_s: float = 5.0):
+        """
+        Initialize uplink (not connected yet).
+
+        Args:
+            host (str): Broker/server host
+            port (int): Broker/server port
+            ack_timeout_s (float): Max wait for an ack before the
+                connection is considered dead
+        """
+        self.host = host
+        self.port = port
+        self.ack_timeout_s = ack_timeout_s
+        self._sock = None
+        self._decoder = MessageDecoder()
+        self._seq = 0
+        self._inflight: dict[int, tuple] = {}  # seq → (event, sent_at)
+
+    @property
+    def connected(self) -> bool:
+        """True while a connection is open."""
+        return self._sock is not None
+
+    @property
+    def inflight_count(self) -> int:
+        """Number of events sent but not yet acknowledged."""
+        return len(self._inflight)
+
+    def connect(self) -> bool:
+        """
+        Open the connection.
+
+        Returns:
+            bool: True if connected
+        """
+        try:
+            sock = socket.create_connection(
+                (self.host, self.port), timeout=self.ack_timeout_s
+            )
+        except OSError as e:
+            log(f"[ENVIO ] ✗ Uplink {self.host}:{self.port} no disponible ({e})")
+            return False
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._decoder = MessageDecoder()
+        log(f"[ENVIO ] ✓ Uplink conectado a {self.host}:{self.port}")
+        return True
+
+    def close(self) -> list:
+        """
+        Close the connection.
+
+        Returns:
+            list: Events that were in flight (not acknowledged)
+        """
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        unacked = [event for event, _ in self._inflight.values()]
+        self._inflight.clear()
+        return unacked
+
+    def send(self, event) -> bool:
+        """
+        Send one event without waiting for its ack.
+
+        Returns:
+            bool: False if the connection failed (it is closed)
+        """
+        self._seq += 1
+        message = {"type": "event", "seq": self._seq, "payload": event.to_dict()}
+        try:
+            self._sock.sendall(encode_message(message))
+        except OSError as e:
+            log(f"[ENVIO ] ✗ Uplink caído al enviar ({e})")
+            self.close()
+            return False
+        self._inflight[self._seq] = (event, time.perf_counter())
+        return True
+
+    def poll_acks(self, timeout: float = 0.0) -> list:
+        """
+        Read available acks.
+
+        Args:
+            timeout (float): Max seconds to wait for data
+
+        Returns:
+            list: Events acknowledged by the server
+        """
+        if self._sock is None:
+            return []
+
+        acked = []
+        try:
+            readable, _, _ = select.select([self._sock], [], [], timeout)
+            if readable:
+                chunk = self._sock.recv(65536)
+                if not chunk:
+                    raise ConnectionError("conexión cerrada por el servidor")
+                for message in self._decoder.feed(chunk):
+                    if message.get("type") != "ack":
+                        continue
+                    entry = self._inflight.pop(message.get("seq"), None)
+                    if entry is not None:
+                        acked.append(entry[0])
+        except (OSError, ValueError) as e:
+            log(f"[ENVIO ] ✗ Uplink caído ({e})")
+            self.close()
+            return acked
+
+        if self._inflight:
+            oldest = min(sent_at for _, sent_at in self._inflight.values())
+            if time.perf_counter() - oldest > self.ack_timeout_s:
+                log(f"[ENVIO ] ✗ Sin ack en {self.ack_timeout_s:.1f} s. Reconectando…")
+                self.close()
+        return acked
+
+
+class _AckHandler(socketserver.BaseRequestHandler):
+    """Acknowledge every event received on one connection."""
+
+    def setup(self) -> None:
+        self.server.track(self.request, add=True)
+
+    def finish(self) -> None:
+        self.server.track(self.request, add=False)
+
+    def handle(self) -> None:
+        decoder = MessageDecoder()
+        while True:
+            try:
+                chunk = self.request.recv(65536)
+            except OSError:
+                return
+            if not chunk:
+                return
+            for message in decoder.feed(chunk):
+                if message.get("type") != "event":
+                    continue
+                self.server.record(message["payload"])
+                self.request.sendall(
+                    encode_message({"type": "ack", "seq": message["seq"]})
+                )
+
+
+class UplinkServer(socketserver.ThreadingTCPServer):
+    """
+    Local stand-in broker: stores events and acknowledges each one.
+
+    Used for development and tests in place of the real backend.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Bind the server (port 0 picks a free port, see ``address``).
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind
+        """
+        super().__init__((host, port), _AckHandler)
+        self.received: list[dict] = []
+        self._received_lock = threading.Lock()
+        self._connections: set = set()
+
+    @property
+    def address(self) -> tuple:
+        """(host, port) actually bound."""
+        return self.server_address[:2]
+
+    def track(self, conn, add: bool) -> None:
+        """Register or forget an open client connection."""
+        with self._received_lock:
+            if add:
+                self._connections.add(conn)
+            else:
+                self._connections.discard(conn)
+
+    def record(self, payload: dict) -> None:
+        """Store a received event payload."""
+        with self._received_lock:
+            self.received.append(payload)
+        log(
+            f"[BROKER] Recibido {payload.get('entity_type')} "
+            f"event_id={payload.get('event_id')}"
+        )
+
+    def start(self) -> threading.Thread:
+        """Serve in a background thread."""
+        thread = threading.Thread(
+            target=self.serve_forever, name="Broker.........", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Stop serving and drop every client connection."""
+        self.shutdown()
+        self.server_close()
+        with self._received_lock:
+            connections = list(self._connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8883
+    server = UplinkServer("0.0.0.0", port)
+    log(f"[BROKER] Escuchando en puerto {server.address[1]}. Ctrl+C para salir.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,6 @@
+"""Make the flat modules in src/ importable, as when running from src/."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
@@ -0,0 +1,284 @@
+"""LocalBuffer: compaction, eviction, requeue, in-flight records, spilling."""
+
+import os
+
+import pytest
+
+from buffer import LocalBuffer
+from models import AggregatedEvent, DetectionEvent
+
+
+def event(cls: str, t: float, frame_id: int) -> DetectionEvent:
+    """Detection captured at ``t`` seconds."""
+    e = DetectionEvent(cls, 0.8, frame_id)
+    e.capture_time = t
+    return e
+
+
+@pytest.fixture
+def spill_path(tmp_path):
+    return str(tmp_path / "spill.jsonl")
+
+
+def make_buffer(spill_path, max_size=10, window=30.0) -> LocalBuffer:
+    return LocalBuffer(max_size, window, spill_path)
+
+
+def records(buf: LocalBuffer) -> list:
+    return list(buf._buffer)
+
+
+def test_first_detection_kept_rest_folded(spill_path):
+    buf = make_buffer(spill_path)
+    for i in range(5):
+        buf.push(event("Person", i, i))
+
+    first, aggregate = records(buf)
+    assert isinstance(first, DetectionEvent) and first.frame_id == 0
+    assert isinstance(aggregate, AggregatedEvent)
+    assert (aggregate.count, aggregate.first_frame_id, aggregate.frame_id) == (4, 1, 4)
+
+
+def test_gap_beyond_window_opens_new_intrusion(spill_path):
+    buf = make_buffer(spill_path, window=10.0)
+    buf.push(event("Person", 0, 0))
+    buf.push(event("Person", 5, 1))
+    buf.push(event("Person", 100, 2))
+
+    assert [type(r).__name__ for r in records(buf)] == [
+        "DetectionEvent", "AggregatedEvent", "DetectionEvent",
+    ]
+
+
+def test_classes_compact_independently(spill_path):
+    buf = make_buffer(spill_path)
+    for i in range(3):
+        buf.push(event("Person", i, i))
+        buf.push(event("Dog", i, i))
+
+    assert [(r.entity_type, getattr(r, "count", 1)) for r in records(buf)] == [
+        ("Person", 1), ("Dog", 1), ("Person", 2), ("Dog", 2),
+    ]
+
+
+def test_window_zero_disables_compaction(spill_path):
+    buf = make_buffer(spill_path, window=0)
+    for i in range(4):
+        buf.push(event("Person", i, i))
+    assert len(records(buf)) == 4
+
+
+def test_evicted_first_event_keeps_folding_into_aggregate(spill_path):
+    buf = make_buffer(spill_path, max_size=2)
+    buf.push(event("Person", 0, 0))
+    buf.push(event("Person", 1, 1))  # aggregate
+    buf.push(event("Dog", 2, 2))     # evicts the first Person event
+    buf.push(event("Person", 3, 3))
+
+    aggregate, dog = records(buf)
+    assert aggregate.entity_type == "Person" and aggregate.count == 2
+    assert dog.entity_type == "Dog"
+
+
+def test_evicted_aggregate_closes_intrusion(spill_path):
+    buf = make_buffer(spill_path, max_size=2, window=0)
+    buf.push(event("Person", 0, 0))
+    buf.compact_window_s = 30.0
+    buf.push(event("Person", 1, 1))  # aggregate
+    buf.push(event("Dog", 2, 2))     # evicts the first Person event
+    buf.push(event("Dog", 3, 3))     # evicts the aggregate
+    buf.push(event("Person", 4, 4))
+
+    assert [(r.entity_type, type(r).__name__) for r in records(buf)] == [
+        ("Dog", "AggregatedEvent"), ("Person", "DetectionEvent"),
+    ]
+
+
+def test_requeue_restores_order_and_compaction(spill_path):
+    buf = make_buffer(spill_path)
+    for i in range(3):
+        buf.push(event("Person", i, i))
+    pending = buf.flush()
+    assert buf.pending_count() == 0
+
+    buf.push(event("Dog", 3, 3))
+    buf.requeue(pending)
+    buf.push(event("Person", 4, 4))
+
+    first, aggregate, dog = records(buf)
+    assert first.frame_id == 0
+    assert aggregate.count == 3 and aggregate.frame_id == 4
+    assert dog.entity_type == "Dog"
+
+
+def test_resize_keeps_newest(spill_path):
+    buf = make_buffer(spill_path, window=0)
+    for i in range(5):
+        buf.push(event("Person", i, i))
+    buf.resize(2)
+    assert [r.frame_id for r in records(buf)] == [3, 4]
+
+
+def test_checkout_marks_in_flight_until_removed(spill_path):
+    buf = make_buffer(spill_path, window=0)
+    for i in range(3):
+        buf.push(event("Person", i, i))
+
+    batch = buf.checkout(2)
+    assert [r.frame_id for r in batch] == [0, 1]
+    assert [r.frame_id for r in buf.checkout(5)] == [2]
+    assert buf.checkout(5) == []
+
+    buf.remove(batch[0])
+    buf.release_inflight()
+    assert [r.frame_id for r in buf.checkout(5)] == [1, 2]
+    assert buf.pending_count() == 2
+
+
+def test_in_flight_aggregate_is_not_mutated(spill_path):
+    buf = make_buffer(spill_path)
+    buf.push(event("Person", 0, 0))
+    buf.push(event("Person", 1, 1))
+    first, aggregate = buf.checkout(5)
+
+    buf.push(event("Person", 2, 2))
+
+    assert aggregate.count == 1 and aggregate.frame_id == 1
+    newer = records(buf)[2]
+    assert isinstance(newer, AggregatedEvent) and newer.count == 1
+    buf.push(event("Person", 3, 3))
+    assert newer.count == 2 and aggregate.count == 1
+
+
+def test_eviction_drops_in_flight_mark(spill_path):
+    buf = make_buffer(spill_path, max_size=2, window=0)
+    buf.push(event("Person", 0, 0))
+    buf.checkout(1)
+    buf.push(event("Person", 1, 1))
+    buf.push(event("Person", 2, 2))  # evicts the in-flight record
+
+    assert buf._inflight == set()
+    assert [r.frame_id for r in buf.checkout(5)] == [1, 2]
+
+
+def test_spilled_events_are_not_dropped_by_capacity(spill_path):
+    buf = make_buffer(spill_path, max_size=5, window=0)
+    for i in range(5):
+        buf.push(event("Person", i, i))
+    assert buf.spill() == 5
+    for i in range(5, 10):
+        buf.push(event("Person", i, i))
+
+    assert buf.pending_count() == 10
+    assert [r.frame_id for r in buf.flush()] == list(range(10))
+    assert buf.pending_count() == 0
+
+
+def test_batched_flush_reads_only_what_it_returns(spill_path):
+    buf = make_buffer(spill_path, max_size=5, window=0)
+    for i in range(8):
+        buf.push(event("Person", i, i))
+        if i == 4:
+            buf.spill()
+
+    batch = buf.flush(3)
+    assert [r.frame_id for r in batch] == [0, 1, 2]
+    assert buf.spilled_count() == 2
+
+    buf.requeue(batch[1:])  # doesn't fit in memory: back to disk, in order
+    assert buf.pending_count() == 7
+    assert [r.frame_id for r in buf.flush()] == list(range(1, 8))
+
+
+def test_checkout_restores_oldest_spilled_first(spill_path):
+    buf = make_buffer(spill_path, max_size=4, window=0)
+    for i in range(4):
+        buf.push(event("Person", i, i))
+    buf.spill()
+    buf.push(event("Person", 4, 4))
+
+    assert [r.frame_id for r in buf.checkout(2)] == [0, 1]
+    assert buf.spilled_count() == 2
+
+    # Released records spilled again stay ahead of newer ones on disk
+    buf.release_inflight()
+    buf.spill()
+    assert [r.frame_id for r in buf.flush()] == [0, 1, 2, 3, 4]
+
+
+def test_spill_file_survives_restart(spill_path):
+    buf = make_buffer(spill_path)
+    buf.push(event("Person", 0, 0))
+    buf.push(event("Person", 1, 1))
+    buf.push(event("Person", 100, 2))  # closes the first intrusion
+    assert buf.spill() == 2
+
+    restarted = make_buffer(spill_path)
+    restarted.push(event("Dog", 101, 3))
+    first, aggregate, dog = restarted.flush()
+    assert (first.frame_id, aggregate.count, dog.entity_type) == (0, 1, "Dog")
+    assert isinstance(aggregate, AggregatedEvent)
+
+
+def test_open_intrusion_stays_in_memory_and_compacting(spill_path):
+    buf = make_buffer(spill_path)
+    for i in range(60):
+        buf.push(event("Person", i, i))
+        buf.spill()
+
+    assert buf.pending_count() == 2 and buf.spilled_count() == 0
+    first, aggregate = buf.flush()
+    assert first.frame_id == 0 and aggregate.count == 59
+
+
+def test_spill_file_is_capped(spill_path):
+    buf = make_buffer(spill_path, window=0)
+    buf.spill_max = 3
+    for i in range(5):
+        buf.push(event("Person", i, i))
+    buf.spill()
+
+    assert buf.spilled_count() == 3
+    assert [r.frame_id for r in buf.flush()] == [2, 3, 4]
+
+
+def test_failed_retry_rewinds_spill_file(spill_path):
+    buf = make_buffer(spill_path, max_size=5, window=0)
+    for i in range(4):
+        buf.push(event("Person", i, i))
+    buf.spill()
+    buf.push(event("Person", 4, 4))
+    size = os.path.getsize(spill_path)
+
+    batch = buf.flush(3)
+    buf.requeue(batch)  # disk records go back to disk, nothing rewritten
+
+    assert buf.spilled_count() == 4 and len(buf._buffer) == 1
+    assert os.path.getsize(spill_path) == size
+    assert [r.frame_id for r in buf.flush()] == [0, 1, 2, 3, 4]
+    assert not os.path.exists(spill_path)
+
+
+def test_acked_records_leave_no_index_entries(spill_path):
+    buf = make_buffer(spill_path, max_size=3, window=0)
+    for i in range(50):
+        buf.push(event("Person", i, i))
+        for record in buf.checkout(5):
+            buf.remove(record)
+
+    assert buf.pending_count() == 0
+    assert buf._seqs == {} and buf._inflight == set()
+
+
+def test_requeue_after_draining_disk_keeps_order(spill_path):
+    buf = make_buffer(spill_path, max_size=5, window=0)
+    for i in range(3):
+        buf.push(event("Person", i, i))
+    buf.spill()
+    buf.push(event("Person", 3, 3))
+
+    batch = buf.flush(3)
+    assert not os.path.exists(spill_path)
+    buf.requeue(batch)
+    buf.push(event("Person", 4, 4))
+    assert [r.frame_id for r in buf.flush()] == [0, 1, 2, 3, 4]
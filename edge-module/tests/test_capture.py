@@ -0,0 +1,190 @@
+"""CaptureSource against a scripted fake cv2: stalls, backoff, end of file."""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from capture import CaptureSource, parse_source, source_kind
+
+
+class FakeFrame:
+    shape = (48, 64, 3)
+
+
+class FakeCapture:
+    """VideoCapture whose reads replay a list of stream positions (ms)."""
+
+    def __init__(self, cv2, positions, read_delay):
+        self._cv2 = cv2
+        self._positions = iter(positions) if positions is not None else None
+        self._read_delay = read_delay
+        self._pos = 0.0
+
+    def isOpened(self):
+        return self._positions is not None
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return self._pos if prop == self._cv2.CAP_PROP_POS_MSEC else 0.0
+
+    def read(self):
+        time.sleep(self._read_delay)
+        try:
+            self._pos = next(self._positions)
+        except StopIteration:
+            return False, None
+        return True, FakeFrame()
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def fake_cv2(monkeypatch):
+    """
+    Install a fake cv2 module.
+
+    ``cv2.connections`` lists what each open returns, in order: None for a
+    failed open, else the positions read before the stream errors out.
+    Once exhausted, ``cv2.default`` is used.
+    """
+    cv2 = types.ModuleType("cv2")
+    cv2.CAP_ANY = 0
+    cv2.CAP_PROP_BUFFERSIZE = 38
+    cv2.CAP_PROP_POS_MSEC = 0
+    cv2.CAP_PROP_FPS = 5
+    cv2.CAP_PROP_FRAME_WIDTH = 3
+    cv2.CAP_PROP_FRAME_HEIGHT = 4
+    cv2.connections = []
+    cv2.default = None
+    cv2.read_delay = 0.0
+    cv2.opens = 0
+
+    def video_capture(source, api=None, params=None):
+        cv2.opens += 1
+        positions = cv2.connections.pop(0) if cv2.connections else cv2.default
+        return FakeCapture(cv2, positions, cv2.read_delay)
+
+    cv2.VideoCapture = video_capture
+    monkeypatch.setitem(sys.modules, "cv2", cv2)
+    return cv2
+
+
+class CountingStop(threading.Event):
+    """Stop event that records backoff waits and sets itself after ``limit``."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.waits = []
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        if len(self.waits) >= self.limit:
+            self.set()
+        return self.is_set()
+
+
+@pytest.mark.parametrize(
+    "spec, source, kind",
+    [
+        (0, 0, "device"),
+        ("1", 1, "device"),
+        (" 2 ", 2, "device"),
+        ("rtsp://cam/stream", "rtsp://cam/stream", "stream"),
+        ("http://cam/mjpg", "http://cam/mjpg", "stream"),
+        ("file:///videos/a.mp4", "file:///videos/a.mp4", "file"),
+        ("videos/a.mp4", "videos/a.mp4", "file"),
+    ],
+)
+def test_parse_source_and_kind(spec, source, kind):
+    assert parse_source(spec) == source
+    assert source_kind(parse_source(spec)) == kind
+
+
+def test_file_source_finishes(fake_cv2):
+    fake_cv2.connections = [[33.0, 66.0, 99.0]]
+    source = CaptureSource("clip.mp4")
+
+    source._grab_loop(source._conn_id)
+
+    assert source.finished
+    assert fake_cv2.opens == 1
+    seq, _, frame = source.read(0, timeout=0)
+    assert seq == 3 and isinstance(frame, FakeFrame)
+    # Stopped at end of file: no wait, and no stall reconnect
+    assert source.read(seq, timeout=1.0) is None
+    assert fake_cv2.opens == 1
+
+
+def test_repeated_timestamps_are_not_republished(fake_cv2):
+    fake_cv2.connections = [[40.0, 40.0, 40.0, 80.0]]
+    source = CaptureSource("clip.mp4")
+
+    source._grab_loop(source._conn_id)
+
+    assert source._seq == 2
+
+
+@pytest.mark.parametrize(
+    "connections, waits",
+    [
+        # A frame resets the delay: 0.1, 0.2, frame, 0.1
+        ([None, None, [40.0]], [0.1, 0.2, 0.1]),
+        # An open that never delivers keeps doubling, up to the cap
+        ([None, [], [], []], [0.1, 0.2, 0.3, 0.3]),
+    ],
+)
+def test_backoff_resets_after_a_frame(fake_cv2, connections, waits):
+    fake_cv2.connections = connections
+    source = CaptureSource(0, backoff_s=0.1, backoff_max_s=0.3)
+    source._stop = CountingStop(limit=len(waits))
+
+    source._grab_loop(source._conn_id)
+
+    assert source._stop.waits == pytest.approx(waits)
+
+
+def test_check_stall_respawns_only_stalled_connections(monkeypatch):
+    source = CaptureSource("rtsp://cam", stall_s=0.5)
+    spawned = []
+    monkeypatch.setattr(source, "_spawn", lambda: spawned.append(True))
+
+    source._connected = True
+    source._last_progress = time.monotonic()
+    source.read(0, timeout=0)
+    assert spawned == []
+
+    source._last_progress = time.monotonic() - 1.0
+    source.read(0, timeout=0)
+    assert spawned == [True]
+
+    source._stop.set()
+    source.read(0, timeout=0)
+    assert spawned == [True]
+
+
+def test_frozen_stream_reconnects(fake_cv2):
+    # Frames keep arriving but the stream clock never moves
+    fake_cv2.default = iter(lambda: 1000.0, None)
+    fake_cv2.read_delay = 0.005
+    source = CaptureSource("rtsp://cam", stall_s=0.1, backoff_s=0.01)
+    source.start()
+    try:
+        deadline = time.monotonic() + 3.0
+        last_seq = 0
+        while fake_cv2.opens < 2 and time.monotonic() < deadline:
+            latest = source.read(last_seq, timeout=0.05)
+            if latest is not None:
+                last_seq = latest[0]
+    finally:
+        source.stop()
+
+    assert fake_cv2.opens >= 2
+    # One frame per connection: the frozen repeats were never published
+    assert source._seq <= fake_cv2.opens
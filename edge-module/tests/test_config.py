@@ -0,0 +1,167 @@
+"""Config loading: coercion, validation, precedence and hot reload."""
+
+import json
+import os
+
+import pytest
+
+import config
+from config import Config, ConfigWatcher, _coerce, apply_config, load_config
+
+
+@pytest.fixture(autouse=True)
+def restore_config():
+    """Keep the module-level snapshot and listeners isolated per test."""
+    current, listeners = config._current, list(config._listeners)
+    yield
+    config._current = current
+    config._listeners[:] = listeners
+
+
+@pytest.fixture
+def write_json(tmp_path):
+    path = tmp_path / "edge_config.json"
+
+    def write(data):
+        path.write_text(json.dumps(data) if not isinstance(data, str) else data)
+        return str(path)
+
+    return write
+
+
+def test_coerce_parses_strings_to_declared_types():
+    assert _coerce("COOLDOWN_S", " 2.5 ") == 2.5
+    assert _coerce("BUFFER_MAX", "7") == 7
+    assert _coerce("LIVE_MODE", "yes") is True
+    assert _coerce("LIVE_MODE", "OFF") is False
+    assert _coerce("SPILL_PATH", "x.jsonl") == "x.jsonl"
+
+
+def test_coerce_widens_int_to_float_only():
+    assert _coerce("COOLDOWN_S", 3) == 3.0
+    assert isinstance(_coerce("COOLDOWN_S", 3), float)
+    with pytest.raises(ValueError, match="se esperaba int"):
+        _coerce("BUFFER_MAX", 2.5)
+    with pytest.raises(ValueError, match="se esperaba float"):
+        _coerce("COOLDOWN_S", True)
+
+
+@pytest.mark.parametrize(
+    "key, raw",
+    [("LIVE_MODE", "maybe"), ("BUFFER_MAX", "ten"), ("COOLDOWN_S", "1,5")],
+)
+def test_coerce_rejects_bad_strings(key, raw):
+    with pytest.raises(ValueError, match=key):
+        _coerce(key, raw)
+
+
+def test_defaults_without_file_or_env(tmp_path):
+    snapshot = load_config(str(tmp_path / "missing.json"), environ={})
+    assert snapshot.as_dict() == {k: getattr(Config, k) for k in Config.__annotations__}
+
+
+def test_env_overrides_file_overrides_defaults(write_json):
+    path = write_json({"COOLDOWN_S": 4.0, "BUFFER_MAX": 20})
+    snapshot = load_config(path, environ={"EDGE_COOLDOWN_S": "9"})
+
+    assert snapshot.COOLDOWN_S == 9.0
+    assert snapshot.BUFFER_MAX == 20
+    assert snapshot.RETRY_INTERVAL_S == Config.RETRY_INTERVAL_S
+
+
+def test_unknown_key_is_rejected(write_json):
+    with pytest.raises(ValueError, match="desconocida: NOPE"):
+        load_config(write_json({"NOPE": 1}), environ={})
+
+
+@pytest.mark.parametrize("text", ["{not json", "[1, 2]"])
+def test_malformed_file_is_rejected(write_json, text):
+    with pytest.raises(ValueError, match="JSON"):
+        load_config(write_json(text), environ={})
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("FRAME_INTERVAL_S", 0),
+        ("CONFIDENCE_THRESHOLD", 1.5),
+        ("BUFFER_MAX", 0),
+        ("UPLINK_TRANSPORT", "udp"),
+        ("CASCADE_IMGSZ", 100),
+        ("UPLINK_PORT", 70000),
+        ("SPILL_PATH", ""),
+    ],
+)
+def test_out_of_range_values_are_rejected(write_json, key, value):
+    with pytest.raises(ValueError, match=f"{key}: valor fuera de rango"):
+        load_config(write_json({key: value}), environ={})
+
+
+def test_backoff_max_must_not_be_below_backoff(write_json):
+    path = write_json({"RECONNECT_BACKOFF_S": 5.0, "RECONNECT_BACKOFF_MAX_S": 2.0})
+    with pytest.raises(ValueError, match="RECONNECT_BACKOFF_MAX_S"):
+        load_config(path, environ={})
+
+    path = write_json({"RECONNECT_BACKOFF_S": 2.0, "RECONNECT_BACKOFF_MAX_S": 2.0})
+    assert load_config(path, environ={}).RECONNECT_BACKOFF_MAX_S == 2.0
+
+
+def test_snapshot_is_immutable():
+    snapshot = load_config(None, environ={})
+    with pytest.raises(AttributeError):
+        snapshot.COOLDOWN_S = 1.0
+    assert snapshot.replace(COOLDOWN_S=1.0).COOLDOWN_S == 1.0
+    assert snapshot.COOLDOWN_S == Config.COOLDOWN_S
+
+
+def test_apply_config_reports_changes_and_notifies():
+    calls = []
+    config.subscribe(lambda old, new, changed: calls.append(changed))
+    new = config.get_config().replace(COOLDOWN_S=config.get_config().COOLDOWN_S + 1)
+
+    assert apply_config(new) == {"COOLDOWN_S"}
+    assert config.get_config().COOLDOWN_S == new.COOLDOWN_S
+    assert calls == [{"COOLDOWN_S"}]
+
+    assert apply_config(new) == set()
+    assert len(calls) == 1
+
+
+def test_restart_only_keys_keep_their_value():
+    old = config.get_config()
+    new = old.replace(SPILL_PATH="other.jsonl", LIVE_MODE=not old.LIVE_MODE)
+
+    assert apply_config(new) == set()
+    assert config.get_config().SPILL_PATH == old.SPILL_PATH
+    assert config.get_config().LIVE_MODE == old.LIVE_MODE
+
+
+def test_failing_listener_does_not_block_others():
+    calls = []
+
+    def broken(old, new, changed):
+        raise RuntimeError("boom")
+
+    config.subscribe(broken)
+    config.subscribe(lambda old, new, changed: calls.append(changed))
+    new = config.get_config().replace(BUFFER_MAX=config.get_config().BUFFER_MAX + 1)
+
+    assert apply_config(new) == {"BUFFER_MAX"}
+    assert calls == [{"BUFFER_MAX"}]
+
+
+def test_watcher_applies_valid_changes_and_rejects_invalid(write_json):
+    path = write_json({"COOLDOWN_S": 1.0})
+    watcher = ConfigWatcher(path)
+    assert config.get_config().COOLDOWN_S == 1.0
+
+    write_json({"COOLDOWN_S": 2.0})
+    os.utime(path, (0, 1))
+    assert watcher.check() is True
+    assert config.get_config().COOLDOWN_S == 2.0
+
+    write_json({"COOLDOWN_S": -1.0})
+    os.utime(path, (0, 2))
+    assert watcher.check() is False
+    assert config.get_config().COOLDOWN_S == 2.0
+    assert watcher.check() is False
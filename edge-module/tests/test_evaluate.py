@@ -0,0 +1,64 @@
+"""Pure helpers behind cascade evaluation: IoU, matching, candidate crops."""
+
+import pytest
+
+from cascade import candidate_region
+from evaluate import iou, match_detections
+
+
+def det(cls: str, box: tuple, confidence: float = 0.9) -> dict:
+    return {"class": cls, "box": box, "confidence": confidence}
+
+
+def test_iou_identical_disjoint_and_partial():
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
+    assert iou((0, 0, 10, 10), (5, 0, 15, 10)) == pytest.approx(50 / 150)
+
+
+def test_iou_degenerate_boxes():
+    assert iou((0, 0, 0, 0), (0, 0, 0, 0)) == 0.0
+
+
+def test_match_counts_tp_fp_fn_per_class():
+    reference = [det("Person", (0, 0, 10, 10)), det("Dog", (50, 50, 60, 60))]
+    predicted = [det("Person", (1, 1, 10, 10)), det("Person", (80, 80, 90, 90))]
+
+    assert match_detections(reference, predicted) == {
+        "Person": [1, 1, 0],
+        "Dog": [0, 0, 1],
+    }
+
+
+def test_match_requires_same_class_and_min_iou():
+    reference = [det("Person", (0, 0, 10, 10))]
+    assert match_detections(reference, [det("Dog", (0, 0, 10, 10))]) == {
+        "Dog": [0, 1, 0],
+        "Person": [0, 0, 1],
+    }
+    assert match_detections(reference, [det("Person", (6, 0, 16, 10))]) == {
+        "Person": [0, 1, 1],
+    }
+
+
+def test_match_each_reference_used_once_highest_confidence_first():
+    reference = [det("Person", (0, 0, 10, 10))]
+    predicted = [
+        det("Person", (0, 0, 10, 10), confidence=0.5),
+        det("Person", (0, 0, 10, 9), confidence=0.9),
+    ]
+    assert match_detections(reference, predicted) == {"Person": [1, 1, 0]}
+
+
+def test_candidate_region_merges_and_pads():
+    region = candidate_region([(100, 100, 150, 150), (200, 120, 250, 180)], (480, 640))
+    # Merged box 100..250 x 100..180, padded by 20% of its size
+    assert region == (70, 84, 280, 196)
+
+
+def test_candidate_region_clamps_to_frame():
+    assert candidate_region([(0, 0, 50, 50)], (480, 640)) == (0, 0, 60, 60)
+
+
+def test_candidate_region_large_area_uses_full_frame():
+    assert candidate_region([(0, 0, 600, 400)], (480, 640)) is None
@@ -0,0 +1,88 @@
+"""CPU lists, stage settings and their config validators."""
+
+import json
+import threading
+
+import pytest
+
+from config import load_config
+from scheduling import (
+    DEFAULT_SETTINGS,
+    STAGES,
+    apply_placement,
+    parse_cpus,
+    stage_settings,
+    valid_cpu_list,
+)
+
+
+@pytest.mark.parametrize(
+    "text, cpus",
+    [
+        ("", set()),
+        ("0", {0}),
+        ("2-3", {2, 3}),
+        ("0,2-3", {0, 2, 3}),
+        (" 1 , 4-6 ", {1, 4, 5, 6}),
+        ("1,1-2", {1, 2}),
+    ],
+)
+def test_parse_cpus(text, cpus):
+    assert parse_cpus(text) == cpus
+
+
+@pytest.mark.parametrize("text", ["", "0", "3-3", "0,2-3", "0 , 1"])
+def test_valid_cpu_lists(text):
+    assert valid_cpu_list(text)
+
+
+@pytest.mark.parametrize("text", ["3-1", "0,5-2", "a", "1-", "-1", "1,,2", "1;2"])
+def test_invalid_cpu_lists(text):
+    assert not valid_cpu_list(text)
+
+
+def test_stage_settings_defaults():
+    cfg = load_config(None, environ={})
+    for stage in STAGES:
+        assert stage_settings(cfg, stage) == DEFAULT_SETTINGS
+
+
+def load(tmp_path, **values):
+    path = tmp_path / "edge_config.json"
+    path.write_text(json.dumps(values))
+    return load_config(str(path), environ={})
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("CAPTURE_CPUS", "3-1"),
+        ("PROCESS_CPUS", "x"),
+        ("TRANSMIT_NICE", 20),
+        ("CAPTURE_NICE", -21),
+        ("PROCESS_SCHED", "realtime"),
+        ("TRANSMIT_SCHED", "fifo:100"),
+    ],
+)
+def test_stage_validators_reject(tmp_path, key, value):
+    with pytest.raises(ValueError, match=key):
+        load(tmp_path, **{key: value})
+
+
+def test_stage_validators_accept(tmp_path):
+    cfg = load(
+        tmp_path,
+        CAPTURE_CPUS="0,2-3",
+        PROCESS_NICE=-5,
+        TRANSMIT_SCHED="rr:10",
+    )
+    assert stage_settings(cfg, "CAPTURE")[0] == "0,2-3"
+    assert stage_settings(cfg, "PROCESS")[1] == -5
+    assert stage_settings(cfg, "TRANSMIT")[2] == "rr:10"
+
+
+def test_apply_placement_never_raises():
+    # Unavailable CPUs and a no-op policy are logged, not raised
+    tid = threading.get_native_id()
+    apply_placement(tid, "TEST", "999", 0, "other")
+    apply_placement(tid, "TEST", *DEFAULT_SETTINGS)
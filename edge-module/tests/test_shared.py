@@ -0,0 +1,90 @@
+"""SharedFrame triple buffer: generations, waits and slot ownership."""
+
+import threading
+
+from shared import SharedFrame
+
+
+def test_read_before_any_write():
+    shared = SharedFrame()
+    assert shared.read() == (None, [])
+    assert shared.wait_next(0, timeout=0.01) is None
+
+
+def test_wait_next_returns_newest_generation():
+    shared = SharedFrame()
+    shared.write("f1", ["d1"])
+    shared.write("f2", ["d2"])
+
+    assert shared.wait_next(0, timeout=0) == (2, "f2", ["d2"])
+
+
+def test_unchanged_generation_is_not_redelivered():
+    shared = SharedFrame()
+    shared.write("f1", [])
+    generation, _, _ = shared.wait_next(0, timeout=0)
+
+    assert shared.wait_next(generation, timeout=0.01) is None
+    shared.write("f2", [])
+    assert shared.wait_next(generation, timeout=0)[1] == "f2"
+
+
+def test_wait_blocks_until_write():
+    shared = SharedFrame()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(shared.wait_next(0, 2.0)))
+    waiter.start()
+    shared.write("f1", [])
+    waiter.join(timeout=2.0)
+
+    assert results == [(1, "f1", [])]
+
+
+def test_writer_never_touches_front_slot():
+    shared = SharedFrame()
+    shared.write(["frame1"], [])
+    _, front, _ = shared.wait_next(0, timeout=0)
+
+    # The reader owns ``front`` until its next wait_next(), however many
+    # frames are published meanwhile
+    for i in range(10):
+        shared.write([f"frame{i + 2}"], [])
+    assert front == ["frame1"]
+    assert all(slot[0] is not front for slot in (shared._slots[shared._back],
+                                                 shared._slots[shared._ready]))
+
+    assert shared.wait_next(1, timeout=0)[1] == ["frame11"]
+
+
+def test_read_does_not_swap_front_slot():
+    shared = SharedFrame()
+    shared.write("f1", [])
+    _, front, _ = shared.wait_next(0, timeout=0)
+    shared.write("f2", [])
+
+    assert shared.read() == ("f2", [])
+    assert shared._slots[shared._front][0] is front
+    assert shared.wait_next(1, timeout=0) == (2, "f2", [])
+    assert shared.read() == ("f2", [])
+
+
+def test_writer_and_reader_threads_see_increasing_generations():
+    shared = SharedFrame()
+    seen = []
+
+    def reader():
+        generation = 0
+        while generation < 500:
+            latest = shared.wait_next(generation, timeout=1.0)
+            assert latest is not None
+            generation, frame, _ = latest
+            assert frame == generation
+            seen.append(generation)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for i in range(1, 501):
+        shared.write(i, [])
+    thread.join(timeout=5.0)
+
+    assert seen == sorted(set(seen)) and seen[-1] == 500
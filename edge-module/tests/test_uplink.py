@@ -0,0 +1,154 @@
+"""StreamUplink ↔ UplinkServer round trips with LocalBuffer store-and-forward."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from buffer import LocalBuffer
+from models import AggregatedEvent, DetectionEvent
+from uplink import StreamUplink, UplinkServer
+
+
+@pytest.fixture
+def server():
+    srv = UplinkServer()
+    srv.start()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def silent_server():
+    """Accepts connections and reads everything, but never acks."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    conns = []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            conns.append(conn)
+            threading.Thread(target=lambda: _drain(conn), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield listener.getsockname()[:2]
+    listener.close()
+    for conn in conns:
+        conn.close()
+
+
+def _drain(conn) -> None:
+    try:
+        while conn.recv(65536):
+            pass
+    except OSError:
+        pass
+
+
+def make_buffer(tmp_path, window=30.0) -> LocalBuffer:
+    return LocalBuffer(20, window, str(tmp_path / "spill.jsonl"))
+
+
+def push(buf: LocalBuffer, cls: str, t: float, frame_id: int) -> None:
+    e = DetectionEvent(cls, 0.8, frame_id)
+    e.capture_time = t
+    buf.push(e)
+
+
+def pump(buf: LocalBuffer, uplink: StreamUplink, timeout: float = 2.0) -> None:
+    """Send and collect acks like EdgeModule._pump_uplink until drained."""
+    deadline = time.monotonic() + timeout
+    while buf.pending_count() and uplink.connected and time.monotonic() < deadline:
+        for event in buf.checkout(16 - uplink.inflight_count):
+            if not uplink.send(event):
+                break
+        for event in uplink.poll_acks(timeout=0.01):
+            buf.remove(event)
+    if not uplink.connected:
+        buf.release_inflight()
+
+
+def test_events_acked_and_removed(tmp_path, server):
+    buf = make_buffer(tmp_path, window=0)
+    for i in range(5):
+        push(buf, "Person", i, i)
+
+    uplink = StreamUplink(*server.address, ack_timeout_s=1.0)
+    assert uplink.connect()
+    pump(buf, uplink)
+    uplink.close()
+
+    assert buf.pending_count() == 0
+    assert [p["frame_id"] for p in server.received] == [0, 1, 2, 3, 4]
+
+
+def test_ack_timeout_then_resend(tmp_path, silent_server, server):
+    buf = make_buffer(tmp_path, window=0)
+    for i in range(3):
+        push(buf, "Person", i, i)
+
+    uplink = StreamUplink(*silent_server, ack_timeout_s=0.2)
+    assert uplink.connect()
+    pump(buf, uplink, timeout=1.0)
+    assert not uplink.connected  # no ack in time: connection dropped
+    assert buf.pending_count() == 3
+
+    uplink = StreamUplink(*server.address, ack_timeout_s=1.0)
+    assert uplink.connect()
+    pump(buf, uplink)
+    assert buf.pending_count() == 0
+    assert [p["frame_id"] for p in server.received] == [0, 1, 2]
+
+
+def test_server_disconnect_then_resend(tmp_path, server):
+    buf = make_buffer(tmp_path, window=0)
+    push(buf, "Person", 0, 0)
+    uplink = StreamUplink(*server.address, ack_timeout_s=1.0)
+    assert uplink.connect()
+    pump(buf, uplink)
+
+    server.stop()
+    push(buf, "Person", 1, 1)
+    pump(buf, uplink, timeout=1.0)
+    assert not uplink.connected
+    assert buf.pending_count() == 1
+
+    again = UplinkServer()
+    again.start()
+    try:
+        uplink = StreamUplink(*again.address, ack_timeout_s=1.0)
+        assert uplink.connect()
+        pump(buf, uplink)
+        assert [p["frame_id"] for p in again.received] == [1]
+    finally:
+        again.stop()
+
+
+def test_no_folding_into_in_flight_aggregate(tmp_path, silent_server, server):
+    buf = make_buffer(tmp_path)
+    push(buf, "Person", 0, 0)
+    push(buf, "Person", 1, 1)
+
+    uplink = StreamUplink(*silent_server, ack_timeout_s=5.0)
+    assert uplink.connect()
+    for event in buf.checkout(16):
+        assert uplink.send(event)
+    sent_aggregate = buf._buffer[1]
+
+    push(buf, "Person", 2, 2)
+    push(buf, "Person", 3, 3)
+    assert sent_aggregate.count == 1  # already serialized: left untouched
+    uplink.close()
+    buf.release_inflight()
+
+    uplink = StreamUplink(*server.address, ack_timeout_s=1.0)
+    assert uplink.connect()
+    pump(buf, uplink)
+
+    received = [(p["frame_id"], p.get("count")) for p in server.received]
+    assert received == [(0, None), (1, 1), (3, 2)]
+    assert isinstance(sent_aggregate, AggregatedEvent)